@@ -1,5 +1,6 @@
 from pklearn import Table
-from pklearn.templates import simulate, BasicPlayer
+from pklearn.templates import simulate, simulateParallel, BasicPlayer
+from functools import partial
 from sklearn.ensemble import GradientBoostingRegressor
 
 if __name__ == '__main__':
@@ -36,8 +37,9 @@ if __name__ == '__main__':
 
     for p in players: p.setBankroll(10**6)
 
-    #simulate 20,000 hands and save bankroll history
-    bankrolls = simulate(t, nHands=20000, nTrain=0, nBuyIn=10)
+    #simulate 20,000 hands over 4 processes and save bankroll history
+    bankrolls, stats = simulateParallel(partial(Table, 1, 2, 200), players, nHands=20000, workers=4, nBuyIn=10, seed=0)
+    for s in stats: print s['name'], 'wins %.1f +/- %.1f big blinds per 100 hands' % (s['bbPer100'], s['stdErr'])
 
     #plot bankroll history of each player
     for i in range(6):
@@ -0,0 +1,180 @@
+from pklearn import Table, Dealer
+from pklearn.templates import simulate, BasicPlayer
+from pklearn.deuces.deuces import Evaluator, Deck
+from sklearn.linear_model import LinearRegression
+from sklearn.ensemble import GradientBoostingRegressor
+import numpy as np
+import subprocess
+import argparse
+import platform
+import random
+import copy
+import json
+import time
+import sys
+
+SEED = 0
+
+def timeit(f, repeat=5, warmup=1):
+
+    """ This function calls f 'warmup' times untimed and then 'repeat' times, returning each duration in seconds. """
+
+    for i in range(warmup): f()
+    times = []
+    for i in range(repeat):
+        start = time.time()
+        f()
+        times.append(time.time() - start)
+    return times
+
+def summarize(times, n):
+
+    """ This function converts durations of runs of n operations into operations per second and latency statistics. """
+
+    best = min(times)
+    return {'n': n, 'repeats': len(times), 'bestSeconds': best, 'medianSeconds': float(np.median(times)),
+            'perSecond': n / best, 'meanLatency': float(np.mean(times)) / n}
+
+def seed(s=SEED):
+    random.seed(s)
+    np.random.seed(s)
+
+def makeTable(nPlayers, reg=LinearRegression, memory=10**4):
+
+    """ This function returns a table of nPlayers BasicPlayers which have bought in. """
+
+    t = Table(smallBlind=1, bigBlind=2, maxBuyIn=200, dealer=Dealer(SEED))
+    for i in range(nPlayers):
+        p = BasicPlayer(name='Player ' + str(i+1), reg=reg(), bankroll=10**9, nRaises=10, rFactor=.7, memory=memory)
+        p.buyChips(200)
+        t.addPlayer(p)
+    return t
+
+def benchEvaluator(n):
+
+    """ This function measures scalar and batch evaluations per second for 5, 6 and 7 card hands. """
+
+    seed()
+    results = {}
+    for m in (3, 4, 5):
+        hands = []
+        for i in range(n):
+            deck = Deck()
+            hands.append((deck.draw(m), deck.draw(2)))
+        boards = np.array([b for b, h in hands])
+        holes = np.array([h for b, h in hands])
+
+        for direct in (False, True):
+            if direct and m != 5: continue
+            evaluator = Evaluator(direct=direct)
+            name = '%d card%s' % (m + 2, ' direct' if direct else '')
+
+            def scalar():
+                for b, h in hands: evaluator.evaluate(b, h)
+            results[name] = summarize(timeit(scalar), n)
+            results[name + ' batch'] = summarize(timeit(lambda: evaluator.evaluate_batch(boards, holes)), n)
+    return results
+
+def benchPlayHand(n, sizes=(2, 6, 9), trainHands=500):
+
+    """
+    This function measures hands per second of Table.playHand for each number of players, after the players
+    have trained once so that actions include regressor predictions.
+    """
+
+    results = {}
+    for nPlayers in sizes:
+        seed()
+        t = makeTable(nPlayers)
+        simulate(t, nHands=trainHands, nTrain=trainHands, nBuyIn=10, tPrint=float('inf'))
+        for p in t.getPlayers(): p.stopTraining()
+
+        def play():
+            for i in range(n):
+                for p in t.getPlayers():
+                    p.cashOut()
+                    p.buyChips(200)
+                t.playHand()
+        results['%d players' % nPlayers] = summarize(timeit(play, repeat=3), n)
+    return results
+
+class _Recorder(BasicPlayer):
+
+    """ This class records copies of each GameState and hole cards it acts on, for replaying decisions. """
+
+    def act(self, gameState):
+        self.seen.append((copy.deepcopy(gameState), self._cards, self._stack))
+        return BasicPlayer.act(self, gameState)
+
+def benchAct(n, nPlayers=6, trainHands=500):
+
+    """ This function measures the latency of Player.act on GameStates recorded from trained players. """
+
+    seed()
+    t = Table(smallBlind=1, bigBlind=2, maxBuyIn=200, dealer=Dealer(SEED))
+    for i in range(nPlayers):
+        p = _Recorder(name='Player ' + str(i+1), reg=LinearRegression(), bankroll=10**9, nRaises=10, rFactor=.7, memory=10**4)
+        p.seen = []
+        t.addPlayer(p)
+    simulate(t, nHands=trainHands, nTrain=trainHands, nBuyIn=10, tPrint=float('inf'))
+
+    p = t.getPlayers()[0]
+    p.stopTraining()
+    states = p.seen[-n:]
+
+    def act():
+        for gameState, cards, stack in states:
+            p.takeHoleCards(cards)
+            p._stack = stack
+            BasicPlayer.act(p, gameState)
+    return {'decision': summarize(timeit(act), len(states))}
+
+def benchTrain(sizes, regs):
+
+    """ This function measures Player.train time against the number of samples in memory, for each regressor. """
+
+    results = {}
+    for name, reg in regs:
+        for size in sizes:
+            seed()
+            p = BasicPlayer(name='Player', reg=reg(), bankroll=0, nRaises=10, rFactor=.7, memory=size)
+            p.addExperience(np.random.randint(0, 15, (size, 50)), np.zeros(size), np.random.randint(-200, 200, size))
+            results['%s %d' % (name, size)] = summarize(timeit(p.train, repeat=3, warmup=0), size)
+    return results
+
+def gitCommit():
+
+    try: return subprocess.check_output(['git', 'rev-parse', 'HEAD']).strip()
+    except Exception: return None
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmarks hand evaluation, simulation and training.')
+    parser.add_argument('--output', default='benchmark.json', help='file results are written to as JSON')
+    parser.add_argument('--quick', action='store_true', help='smaller runs, for a smoke test')
+    args = parser.parse_args()
+
+    scale = 10 if args.quick else 1
+    regs = [('LinearRegression', LinearRegression)]
+    if not args.quick: regs.append(('GradientBoostingRegressor', GradientBoostingRegressor))
+
+    results = {
+        'commit': gitCommit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': SEED,
+        'evaluator': benchEvaluator(10000 / scale),
+        'playHand': benchPlayHand(1000 / scale),
+        'act': benchAct(2000 / scale),
+        'train': benchTrain([n / scale for n in (10**3, 10**4, 10**5)], regs)
+    }
+
+    for group in ('evaluator', 'playHand', 'act', 'train'):
+        print group
+        for name in sorted(results[group]):
+            r = results[group][name]
+            print '    %-32s %12.1f /s %12.6f s' % (name, r['perSecond'], r['meanLatency'])
+
+    with open(args.output, 'w') as f: json.dump(results, f, indent=2, sort_keys=True)
+    print 'Results written to', args.output
@@ -0,0 +1,82 @@
+from pklearn.settlement import settle
+import random
+
+def legacySettle(bets, ranks, dealer):
+
+    """ This function is the side pot loop Table used before settle(), kept as a reference for checkSettle(). """
+
+    bets = list(bets)
+    numP = len(bets)
+    awards = []
+    n = 0
+    while sum(bets) > 0:    #to handle n side pots
+
+        #get rank of best hand and bet of each player who is eligible to win sub pot
+        minLiveBet = None    #bet that any eligible player has in current sub pot
+        minRank = None
+        eligibleWinners = []
+        for i in range(numP):
+            if ranks[i] is not None and bets[i] != 0:    #if player hasnt folded and has stake in current sub pot
+                if minLiveBet == None: minLiveBet = bets[i]
+                else: minLiveBet = min(minLiveBet, bets[i])
+                eligibleWinners.append(i)
+                if minRank == None: minRank = ranks[i]
+                else: minRank = min(minRank, ranks[i])
+
+        #create sub pot by adding contributions of its members
+        winners = [i for i in eligibleWinners if ranks[i] == minRank]
+        subPot = 0
+        for i in range(numP):
+            contribution = min(minLiveBet, bets[i])
+            bets[i] -= contribution
+            subPot += contribution
+
+        #pay winners
+        winnings = int(float(subPot) / len(winners))
+        for w in winners:
+            awards.append((w, winnings, n, False))
+            subPot -= winnings
+
+        #give odd chips to player in earliest position
+        if subPot > 0:
+            actor = (dealer + 1) % numP
+            while subPot > 0:
+                if actor in winners:
+                    awards.append((actor, subPot, n, True))
+                    subPot = 0
+                actor = (actor + 1) % numP
+
+        n += 1
+
+    return awards
+
+def checkSettle(nHands=100000, seed=0):
+
+    """
+    This function checks settle() against the side pot loop it replaced on nHands random hands, with random
+    contributions, folds, tied ranks and dealer, and checks that every chip contributed is awarded. Raises an
+    Exception at the first hand which differs.
+    """
+
+    rng = random.Random(seed)
+    for h in range(nHands):
+        numP = rng.randint(2, 9)
+        bets = [rng.choice([0, rng.randint(1, 10), rng.randint(1, 400)]) for i in range(numP)]
+        live = [i for i in range(numP) if rng.random() < .6] or [rng.randrange(numP)]
+        top = max(range(numP), key=lambda i: bets[i])
+        if top not in live: live.append(top)    #a player who has not folded has the largest contribution
+        if bets[top] == 0: bets[top] = 1
+        uncontested = len(live) == 1
+        ranks = [None] * numP
+        for i in live: ranks[i] = -1 if uncontested else rng.randint(1, 4)
+        dealer = rng.randrange(numP)
+
+        awards = settle(bets, ranks, dealer)
+        if awards != legacySettle(bets, ranks, dealer) or sum(a[1] for a in awards) != sum(bets):
+            raise Exception('Settlement differs for bets ' + str(bets) + ', ranks ' + str(ranks) + 
+                            ' and dealer ' + str(dealer) + '.')
+
+if __name__ == '__main__':
+
+    checkSettle()
+    print 'settle() matches the previous side pot loop.'
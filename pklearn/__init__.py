@@ -2,3 +2,6 @@ from table import Table
 from card import Card
 from player import Player
 from gamestate import GameState
+from dealer import Dealer
+from handlog import HandLog
+from events import TableListener, Narrator
@@ -0,0 +1,217 @@
+import os
+import time
+import shutil
+import cPickle
+import tempfile
+import traceback
+import numpy as np
+import multiprocessing as mp
+from multiprocessing.sharedctypes import RawArray
+from workers import seatSnapshot, buyInChunks, buyIn, netWinnings, bbPer100, checkTrainPolicy
+
+class ActorLearner:
+
+    """
+    This class overlaps simulation and training. Actor processes each play hands at their own table with snapshots
+    of the Players and stream the labelled features of every hand into shared memory, while the learner, in the
+    calling process, collects them into the Players, trains them and publishes their regressors. Actors load
+    published regressors between hands, so each hand is played with a single model, and keep playing while the
+    learner trains. Since models are published as training completes, results depend on timing and are not
+    reproducible from a seed.
+    """
+
+    def __init__(self, players, tableFactory, nActors=2, bufferSize=2**20, seed=None):
+
+        """
+        Constructor accepts the Players seated at every table (list), a callable such that
+        tableFactory(dealer=dealer) returns an empty Table, the number of actor processes (int), the number of
+        floats in the shared buffer of each Player at each actor (int) and a seed (int).
+        """
+
+        self._players = list(players)
+        self._tableFactory = tableFactory
+        self._nActors = nActors
+        self._bufferSize = bufferSize
+        self._rng = np.random.RandomState(seed)
+
+    def run(self, nHands, firstTrain=0, nTrain=1000, nBuyIn=10, trainPolicy='full', tPoll=.01):
+
+        """
+        This method plays nHands hands at each actor, cashing out/buying in Players every nBuyIn hands, or only
+        before the first hand if nBuyIn is 0. Players are trained by the learner once actors have played
+        firstTrain hands in total and again whenever they have played nTrain more, with the samples collected so
+        far. trainPolicy is as for simulate(). The learner checks for samples every tPoll seconds. Returns a
+        dictionary of the hands played, trainings, models published, samples dropped because a buffer was full,
+        elapsed seconds and a list of the name, net chips won and win rate in big blinds per 100 hands of each
+        Player.
+        """
+
+        checkTrainPolicy(trainPolicy)
+
+        start = time.time()
+        modelDir = tempfile.mkdtemp(prefix='pklearn')
+        version = mp.Value('l', 0)    #version of published models, 0 before first
+        hands = [mp.Value('l', 0) for a in range(self._nActors)]    #hands played by each actor
+        rings = [[_ExperienceRing(self._bufferSize) for p in self._players] for a in range(self._nActors)]
+        results = mp.Queue()
+
+        for p in self._players: p.cashOut()
+        snapshot = cPickle.dumps([p.snapshot() for p in self._players], cPickle.HIGHEST_PROTOCOL)
+        actors = []
+        for a in range(self._nActors):
+            args = (a, self._tableFactory, snapshot, nHands, nBuyIn, self._rng.randint(2**31 - 1), modelDir, version,
+                    hands[a], rings[a], results)
+            actors.append(mp.Process(target=_act, args=args))
+        for actor in actors: actor.start()
+
+        nextTrain = firstTrain if firstTrain > 0 else nTrain    #total hands at which players next train
+        nTrainings = 0
+        finished = {}    #hands played and net chips of each player of each actor which has finished
+        try:
+            while len(finished) < self._nActors:
+
+                self._collect(rings)
+                while not results.empty():
+                    a, result = results.get()
+                    if isinstance(result, basestring): raise Exception('Actor failed:\n' + result)
+                    finished[a] = result
+
+                if sum(h.value for h in hands) >= nextTrain and len(finished) < self._nActors:
+                    for p in self._players:
+                        if p.getMemorySize() == 0: continue
+                        update = trainPolicy(p, nTrainings) if callable(trainPolicy) else trainPolicy == 'incremental'
+                        p.train(update)
+                    nTrainings += 1
+                    self._publish(modelDir, version)
+                    nextTrain = sum(h.value for h in hands) + nTrain
+                else: time.sleep(tPoll)
+
+            self._collect(rings)
+        except:
+            for actor in actors: actor.terminate()
+            raise
+        finally:
+            for actor in actors: actor.join()
+            shutil.rmtree(modelDir, ignore_errors=True)
+
+        played = sum(finished[a][0] for a in finished)
+        bigBlind = finished[0][2]
+        stats = []
+        for i, p in enumerate(self._players):
+            net = sum(finished[a][1][i] for a in finished)
+            p.setBankroll(p.getBankroll() + net)
+            stats.append({'name': p.getName(), 'net': net, 'bbPer100': bbPer100(net, bigBlind, played)})
+
+        return {'hands': played, 'trainings': nTrainings, 'models': version.value,
+                'dropped': sum(r.getDropped() for actorRings in rings for r in actorRings),
+                'time': time.time() - start, 'players': stats}
+
+    def _collect(self, rings):
+
+        """ This method moves the samples streamed by actors into the learner's Players. """
+
+        for actorRings in rings:
+            for p, ring in zip(self._players, actorRings):
+                features, stacks, labels = ring.read()
+                if len(labels): p.addExperience(features, stacks, labels)
+
+    def _publish(self, modelDir, version):
+
+        """ This method writes the regressors of the Players to modelDir and then replaces the published ones. """
+
+        path = os.path.join(modelDir, 'models')
+        models = [p.getRegressor() if p.isFit() else None for p in self._players]
+        with open(path + '.tmp', 'wb') as f: cPickle.dump(models, f, cPickle.HIGHEST_PROTOCOL)
+        os.rename(path + '.tmp', path)    #atomic, so actors never read a partial file
+        with version.get_lock(): version.value += 1
+
+    def getPlayers(self): return self._players[:]
+
+class _ExperienceRing:
+
+    """
+    This class is a ring buffer of labelled samples in shared memory, written by one actor and read by the
+    learner. Each row holds the stack size, label and features of a sample. The number of features is set by the
+    first write. Samples which do not fit while the learner is behind are dropped.
+    """
+
+    def __init__(self, size):
+
+        self._raw = RawArray('d', size)
+        self._width = mp.Value('l', 0)      #floats per row
+        self._written = mp.Value('l', 0)    #rows ever written, only changed by actor
+        self._read = mp.Value('l', 0)       #rows ever read, only changed by learner
+        self._dropped = mp.Value('l', 0)
+        self._rows = None                   #view of buffer as (capacity x width) array
+
+    def _view(self):
+
+        if self._rows is None and self._width.value > 0:
+            width = self._width.value
+            capacity = len(self._raw) // width
+            if capacity == 0: raise Exception('Shared buffer is smaller than one sample.')
+            self._rows = np.frombuffer(self._raw, dtype=np.float64)[:capacity * width].reshape(capacity, width)
+        return self._rows
+
+    def write(self, features, stacks, labels):
+
+        """ This method appends samples, given as arrays of features, stack sizes and labels. """
+
+        n = len(labels)
+        if n == 0: return
+        if self._width.value == 0: self._width.value = features.shape[1] + 2
+        rows = self._view()
+
+        written = self._written.value
+        keep = min(n, len(rows) - (written - self._read.value))
+        if keep < n:
+            with self._dropped.get_lock(): self._dropped.value += n - keep
+        if keep <= 0: return
+
+        at = (written + np.arange(keep)) % len(rows)
+        rows[at, 0] = stacks[:keep]
+        rows[at, 1] = labels[:keep]
+        rows[at, 2:] = features[:keep]
+        with self._written.get_lock(): self._written.value = written + keep    #publish rows after writing them
+
+    def read(self):
+
+        """ This method returns the features, stack sizes and labels of the samples written since the last read. """
+
+        written, read = self._written.value, self._read.value
+        rows = self._view()
+        if written == read or rows is None: return np.empty((0, 0)), np.empty(0), np.empty(0)
+
+        samples = rows[(read + np.arange(written - read)) % len(rows)]    #copy
+        with self._read.get_lock(): self._read.value = written
+        return samples[:, 2:], samples[:, 0], samples[:, 1]
+
+    def getDropped(self): return self._dropped.value
+
+def _act(a, tableFactory, snapshot, nHands, nBuyIn, seed, modelDir, version, hands, rings, results):
+
+    """ This function plays the hands of one actor process and streams their samples to its rings. """
+
+    try:
+        table, players, start = seatSnapshot(tableFactory, snapshot, seed)
+
+        loaded = 0    #version of models in use
+        played = 0
+        for n in buyInChunks(nHands, nBuyIn):
+            buyIn(players, table.getParams()[2])
+            for hand in range(n):
+
+                #swap in newly published models between hands
+                if version.value != loaded:
+                    loaded = version.value
+                    with open(os.path.join(modelDir, 'models'), 'rb') as f: models = cPickle.load(f)
+                    for p, reg in zip(players, models):
+                        if reg is not None: p.setRegressor(reg)
+
+                if table.playHand():
+                    played += 1
+                    for p, ring in zip(players, rings): ring.write(*p.recentExperience())
+                with hands.get_lock(): hands.value += 1
+
+        results.put((a, (played, netWinnings(players, start), table.getParams()[1])))
+    except Exception: results.put((a, traceback.format_exc()))
@@ -0,0 +1,56 @@
+from player import decideJointly
+
+def playTables(tables, nHands):
+
+    """
+    This function plays up to nHands hands at each of tables (list of Tables) concurrently, with the same rules
+    as Table.playHands(). Each table runs as a Table.decisionPoints() generator until its next decision, and the
+    pending decisions of all Players who share a fit regressor, and of all Players who are not yet fit, are made
+    together by decideJointly(), with a single prediction per regressor at each step. Tables are then resumed
+    with their chosen actions. Features of chosen actions are stored as by Player.act(). A Player may only be
+    seated at one of tables, since a Player has one stack. Returns the number of decisions made.
+    """
+
+    seated = set()
+    for t in tables:
+        for p in t.getPlayers():
+            if p in seated: raise Exception('Player is seated at more than one table.')
+            seated.add(p)
+
+    pending = []    #(table generator, player, gameState) of each table waiting for an action
+    for t in tables: _resume(t.decisionPoints(nHands), None, pending)
+
+    nDecisions = 0
+    while pending:
+
+        #group decisions by regressor, in order of table so that random actions are reproducible
+        keys = []
+        groups = {}
+        for decision in pending:
+            player = decision[1]
+            key = id(player.getRegressor()) if player.isFit() else None
+            if key not in groups:
+                keys.append(key)
+                groups[key] = []
+            groups[key].append(decision)
+
+        pending = []
+        for key in keys:
+            decisions = groups[key]
+            players = [d[1] for d in decisions]
+            actions, features = decideJointly(players, [d[2] for d in decisions], [p.show() for p in players],
+                                              [p.getStack() for p in players])
+            for (gen, player, gameState), action, f in zip(decisions, actions, features):
+                player.recordDecision(f, player.getStack())
+                _resume(gen, action, pending)
+            nDecisions += len(decisions)
+
+    return nDecisions
+
+def _resume(gen, action, pending):
+
+    """ This function sends action to a table generator and adds its next decision to pending, unless it is done. """
+
+    try: player, gameState = gen.send(action)
+    except StopIteration: return
+    pending.append((gen, player, gameState))
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from card import Card
+
+_BY_SUIT = [[Card(n, s) for n in range(2, 15)] for s in Card.suits]    #card of each suit index and number - 2
+
+class PredictionCache:
+
+    """
+    This class holds the predicted returns of the actions of a Player's decisions by their features, evicting the
+    least recently used prediction once it holds size predictions, and counts hits and misses.
+    """
+
+    def __init__(self, size):
+
+        self._size = size
+        self._predictions = OrderedDict()    #prediction of each key, least recently used first
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+
+        """ This method returns the prediction stored for key (tuple), or None. """
+
+        prediction = self._predictions.pop(key, None)
+        if prediction is None:
+            self._misses += 1
+            return None
+        self._predictions[key] = prediction    #most recently used
+        self._hits += 1
+        return prediction
+
+    def put(self, key, prediction):
+        self._predictions[key] = prediction
+        if len(self._predictions) > self._size: self._predictions.popitem(last=False)
+
+    def clear(self): self._predictions.clear()
+
+    def getStats(self): return {'hits': self._hits, 'misses': self._misses, 'size': len(self._predictions)}
+
+    def getSize(self): return self._size
+
+    def __len__(self): return len(self._predictions)
+
+def canonicalCards(holeCards, board):
+
+    """
+    This function relabels the suits of hole cards and board (lists of Cards) so that every deal which differs only
+    by a permutation of suits gives the same cards. Suits are ordered by the numbers of the hole cards and then of
+    the board cards of each suit, and each group of cards is sorted by number and suit. Returns the relabeled hole
+    cards and board as lists.
+    """
+
+    hole = ([], [], [], [])
+    seen = ([], [], [], [])
+    for c in holeCards: hole[c.getSuitIndex()].append(c.getNumber())
+    for c in board: seen[c.getSuitIndex()].append(c.getNumber())
+    for s in range(4):
+        hole[s].sort(reverse=True)
+        seen[s].sort(reverse=True)
+
+    #suits in canonical order
+    relabel = [0] * 4
+    for i, (h, b, s) in enumerate(sorted(zip(hole, seen, range(4)), reverse=True)): relabel[s] = i
+
+    newHole = sorted([(c.getNumber(), relabel[c.getSuitIndex()]) for c in holeCards])
+    newBoard = sorted([(c.getNumber(), relabel[c.getSuitIndex()]) for c in board])
+    return [_BY_SUIT[s][n - 2] for n, s in newHole], [_BY_SUIT[s][n - 2] for n, s in newBoard]
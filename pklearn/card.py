@@ -1,47 +1,73 @@
 from deuces import deuces
 
-class Card:
-    
+class Card(object):
+
+    """
+    This class represents a playing card. Cards are immutable and interned: there is a single instance of each of
+    the 52 cards, which holds its number, suit, suit index and deuces integer, so that cards cost nothing to copy,
+    compare or convert.
+    """
+
+    __slots__ = ('_numLet', '_number', '_suit', '_suitIndex', '_int', '_str')
+
     nEnum = {'T':10, 'J':11, 'Q':12, 'K':13, 'A':14}
     suits = ['c', 'd', 's', 'h']
+    _interned = {}    #card of each (number, suit) and of each (numLet, suit) it has been requested by
 
-    def __init__(self, numLet, suit):
+    def __new__(cls, numLet, suit):
 
         """ Constructor accepts number [2-14] or letter (T,J,Q,K,A) of card and suit of card (c,d,s,h). """
 
+        key = (numLet, suit)
+        try: card = Card._interned.get(key)
+        except TypeError: card = None    #unhashable arguments are rejected below
+        if card is not None and type(numLet) in (int, str): return card    #10.0 or u'A' would match a valid key
+
         if type(numLet) == int:
             if numLet < 2 or numLet > 14: raise Exception('Card number must be between 2 and 14 (inclusive).')
-            self._numLet = numLet
-            for k in self.nEnum:
-                if self.nEnum[k] == numLet: self._numLet = k
+            number = numLet
         elif type(numLet) == str:
-            if numLet.upper() not in self.nEnum: raise Exception("Card letter must be \'T\', \'J\', \'Q\', \'K\', or \'A\'.")
-            self._numLet = numLet.upper()
+            if numLet.upper() not in cls.nEnum: raise Exception("Card letter must be \'T\', \'J\', \'Q\', \'K\', or \'A\'.")
+            number = cls.nEnum[numLet.upper()]
         else: raise Exception('Card number/letter must be number or string.')
 
-        if suit.lower() not in self.suits: raise Exception("Invalid suit. Valid suits are \'c\', \'d\', \'s\', and \'h\'.")
-        self._suit = suit.lower()
+        if suit.lower() not in cls.suits: raise Exception("Invalid suit. Valid suits are \'c\', \'d\', \'s\', and \'h\'.")
+        suit = suit.lower()
 
-    def getNumber(self):
-        
-        """ This method returns number of card. It converts letter to number if necesary. """
-        
-        if self._numLet in self.nEnum: return self.nEnum[self._numLet]
-        return self._numLet
+        card = Card._interned.get((number, suit))
+        if card is None:
+            card = object.__new__(cls)
+            numLet = number
+            for k in cls.nEnum:
+                if cls.nEnum[k] == number: numLet = k
+            object.__setattr__(card, '_numLet', numLet)
+            object.__setattr__(card, '_number', number)
+            object.__setattr__(card, '_suit', suit)
+            object.__setattr__(card, '_suitIndex', cls.suits.index(suit))
+            object.__setattr__(card, '_str', str(numLet) + suit)
+            object.__setattr__(card, '_int', deuces.Card.new(card._str))
+            Card._interned[(number, suit)] = card
 
-    def getSuit(self): return self._suit
+        Card._interned[key] = card
+        return card
 
-    def toInt(self): return deuces.Card.new(str(self)) #returns int compatible with deuces library
+    def getNumber(self): return self._number
 
-    def __lt__(self, other): return self.getNumber() < other.getNumber()
+    def getSuit(self): return self._suit
 
-    def __str__(self): return str(self._numLet) + self._suit
+    def getSuitIndex(self): return self._suitIndex    #position of suit in Card.suits
 
-        
+    def toInt(self): return self._int    #returns int compatible with deuces library
 
+    def __lt__(self, other): return self._number < other._number
 
+    def __str__(self): return self._str
 
+    def __repr__(self): return 'Card(' + repr(self._numLet) + ', ' + repr(self._suit) + ')'
 
-        
+    def __setattr__(self, name, value): raise Exception('Cards are immutable.')
 
+    def __reduce__(self): return (Card, (self._number, self._suit))    #unpickles to the interned card
 
+#every card by deck index, as dealt by Dealer
+Card.DECK = [Card(i, s) for s in ['c', 'd', 'h', 's'] for i in range(2, 15)]
@@ -0,0 +1,53 @@
+import numpy as np
+
+class Dealer:
+
+    """
+    This class deals shuffled decks for a Table. Decks are pre-generated in blocks of permutations of the card
+    indices 0-51 from the Dealer's own explicitly seeded random number generator, so that taking the next deck is
+    a pointer advance and the sequence of decks is reproducible from the seed.
+    """
+
+    def __init__(self, seed=None, blockSize=10000):
+
+        """ Constructor accepts seed of random number generator (int or None) and number of decks per block (int). """
+
+        self._seed = seed
+        self._rng = np.random.RandomState(seed)
+        self._blockSize = blockSize
+        self._block = None          #pre-generated decks, one per row
+        self._next = blockSize      #row of next deck in self._block
+
+    def nextDeck(self):
+
+        """ This method returns the next shuffled deck as an array of 52 card indices. """
+
+        if self._next == self._blockSize:
+            self._block = np.argsort(self._rng.random_sample((self._blockSize, 52)), axis=1).astype(np.int8)
+            self._next = 0
+
+        deck = self._block[self._next]
+        self._next += 1
+        return deck
+
+    def spawn(self, n):
+
+        """
+        This method returns n Dealers with independent streams of decks seeded from this Dealer's generator,
+        e.g. one for each table or worker of a parallel run.
+        """
+
+        return [Dealer(s, self._blockSize) for s in self._rng.randint(2**31 - 1, size=n)]
+
+    def generator(self, stream):
+
+        """
+        This method returns a random number generator for stream (int) which is independent of the Dealer's decks,
+        e.g. to sample runouts of a board. It is seeded from the Dealer's seed and stream without drawing from the
+        Dealer's generator, so the decks dealt are unchanged.
+        """
+
+        if self._seed is None: return np.random.RandomState()
+        return np.random.RandomState([self._seed, stream])    #seeded by array, unlike the decks
+
+    def getSeed(self): return self._seed
@@ -1,3 +1,4 @@
 from card import Card 
 from deck import Deck 
 from evaluator import Evaluator 
+from seven import SevenCardTable 
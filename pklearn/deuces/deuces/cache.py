@@ -0,0 +1,43 @@
+import os
+import tempfile
+import numpy as np
+
+# directory holding generated lookup tables, may be overridden with $DEUCES_CACHE
+CACHE_DIR = os.environ.get('DEUCES_CACHE', os.path.join(os.path.expanduser('~'), '.deuces'))
+
+def cache_path(name):
+    """
+    Returns the path of the cached array file called 'name'.
+    """
+    return os.path.join(CACHE_DIR, name + '.npy')
+
+def load_array(name, build):
+    """
+    Returns the array cached under 'name' as a read-only memory map.
+
+    The first caller builds the array with build() and writes it to disk,
+    every later caller (including other processes) maps the same file, so
+    the operating system keeps a single copy of the table in memory. If
+    the cache directory is not writable the freshly built array is
+    returned instead.
+    """
+    path = cache_path(name)
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+
+    array = build()
+    try:
+        if not os.path.isdir(CACHE_DIR):
+            os.makedirs(CACHE_DIR)
+
+        # write to a temporary file and rename it so that concurrent
+        # builders never map a partially written table
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array)
+        os.chmod(tmp, 0o644)
+        os.rename(tmp, path)
+    except (IOError, OSError):
+        return array
+
+    return np.load(path, mmap_mode='r')
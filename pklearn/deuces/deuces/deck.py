@@ -18,12 +18,13 @@ class Deck:
         shuffle(self.cards)
 
     def draw(self, n=1):
+        # deal from the end of the list so drawing does not shift the deck
         if n == 1:
-            return self.cards.pop(0)
+            return self.cards.pop()
 
-        cards = []
-        for i in range(n):
-            cards.append(self.draw())
+        cards = self.cards[-n:]
+        del self.cards[-n:]
+        cards.reverse()
         return cards
 
     def __str__(self):
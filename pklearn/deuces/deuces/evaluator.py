@@ -1,7 +1,9 @@
 import itertools
+import numpy as np
 from card import Card
 from deck import Deck
 from lookup import LookupTable
+from seven import SevenCardTable
 
 class Evaluator(object):
     """
@@ -12,11 +14,17 @@ class Evaluator(object):
     in fact the lookup table generation can be done in under a second and 
     consequent evaluations are very fast. Won't beat C, but very fast as 
     all calculations are done with bit arithmetic and table lookups. 
+
+    With direct=True, 7 card hands are ranked by SevenCardTable with a 
+    single lookup instead of checking all 21 five card subsets.
     """
 
-    def __init__(self):
+    # largest rank of each rank class, in class order
+    RANK_CLASS_MAXES = np.array(sorted(LookupTable.MAX_TO_RANK_CLASS))
+
+    def __init__(self, direct=False):
 
-        self.table = LookupTable()
+        self.table = LookupTable.shared()
         
         self.hand_size_map = {
             5 : self._five,
@@ -24,6 +32,11 @@ class Evaluator(object):
             7 : self._seven
         }
 
+        self.seven_table = None
+        if direct:
+            self.seven_table = SevenCardTable.shared()
+            self.hand_size_map[7] = self.seven_table.evaluate
+
     def evaluate(self, cards, board):
         """
         This is the function that the user calls to get a hand rank. 
@@ -45,8 +58,7 @@ class Evaluator(object):
         # if flush
         if cards[0] & cards[1] & cards[2] & cards[3] & cards[4] & 0xF000:
             handOR = (cards[0] | cards[1] | cards[2] | cards[3] | cards[4]) >> 16
-            prime = Card.prime_product_from_rankbits(handOR)
-            return self.table.flush_lookup[prime]
+            return self.table.flush_lookup[handOR]
 
         # otherwise
         else:
@@ -87,12 +99,143 @@ class Evaluator(object):
 
         return minimum
 
+    def evaluate_showdown(self, board, hands):
+        """
+        Ranks several hands against one board. 
+
+        The board's share of the work is done once: with a 5 card board
+        the rank key and suit counts (direct evaluator) or the board-only
+        best hand and the partial products of its 4 and 3 card subsets are
+        precomputed, and each hand only adds its own two cards. Entries
+        of hands that are None (folded players) are skipped and ranked None.
+        """
+        if len(board) != 5:
+            return [None if hand is None else self.evaluate(list(hand), board) for hand in hands]
+
+        if self.seven_table is not None:
+            return self.seven_table.evaluate_showdown(board, hands)
+
+        flush_lookup = self.table.flush_lookup
+        unsuited_lookup = self.table.unsuited_lookup
+
+        # (suit AND, rank OR, prime product) of every 4 and 3 card board subset
+        partials = []
+        for n in (4, 3):
+            subsets = []
+            for combo in itertools.combinations(board, n):
+                suits = 0xF000
+                bits = 0
+                for c in combo:
+                    suits &= c
+                    bits |= c
+                subsets.append((suits, bits, Card.prime_product_from_hand(combo)))
+            partials.append(subsets)
+        fours, threes = partials
+        board_best = self._five(board)
+
+        ranks = []
+        for hand in hands:
+            if hand is None:
+                ranks.append(None)
+                continue
+
+            h1, h2 = hand
+            best = board_best
+
+            # four board cards and one hole card
+            for suits, bits, product in fours:
+                for c in hand:
+                    if suits & c:
+                        score = flush_lookup[(bits | c) >> 16]
+                    else:
+                        score = unsuited_lookup[product * (c & 0xFF)]
+                    if score < best:
+                        best = score
+
+            # three board cards and both hole cards
+            hand_suits = h1 & h2
+            hand_bits = h1 | h2
+            hand_product = (h1 & 0xFF) * (h2 & 0xFF)
+            for suits, bits, product in threes:
+                if suits & hand_suits:
+                    score = flush_lookup[(bits | hand_bits) >> 16]
+                else:
+                    score = unsuited_lookup[product * hand_product]
+                if score < best:
+                    best = score
+
+            ranks.append(best)
+
+        return ranks
+
+    def evaluate_batch(self, boards, hands, rank_class=False, percentage=False):
+        """
+        Vectorized evaluate() over many hands at once.
+
+        Takes integer arrays of cards of shape (N, 3-5) for boards and (N, 2)
+        for hands and returns an (N,) array of ranks. With rank_class and/or
+        percentage set, returns a tuple that also holds the rank classes and 
+        the five card rank percentages of each hand.
+        """
+        cards = np.hstack((np.asarray(boards, dtype=np.int64), np.asarray(hands, dtype=np.int64)))
+
+        if cards.shape[1] == 7 and self.seven_table is not None:
+            ranks = self.seven_table.evaluate_batch(cards)
+        else:
+            ranks = self._combinations_batch(cards)
+
+        if not rank_class and not percentage:
+            return ranks
+
+        result = (ranks,)
+        if rank_class:
+            result += (self.get_rank_class_batch(ranks),)
+        if percentage:
+            result += (self.get_five_card_rank_percentage_batch(ranks),)
+        return result
+
+    def _combinations_batch(self, cards):
+        """
+        Ranks every 5 card subset of each row of cards with the same lookups
+        as _five() and returns the best rank of each row.
+        """
+        flush_ranks = self.table.flush_array
+        unsuited_keys = self.table.unsuited_array[:, 0]
+        unsuited_ranks = self.table.unsuited_array[:, 1]
+
+        best = np.empty(len(cards), dtype=np.int64)
+        best.fill(LookupTable.MAX_HIGH_CARD)
+        for combo in itertools.combinations(range(cards.shape[1]), 5):
+            hand = cards[:, combo]
+            prime = np.prod(hand & 0xFF, axis=1)
+            rank = unsuited_ranks[np.searchsorted(unsuited_keys, prime)].astype(np.int64)
+
+            flush = (np.bitwise_and.reduce(hand, axis=1) & 0xF000) != 0
+            if flush.any():
+                rankbits = np.bitwise_or.reduce(hand[flush], axis=1) >> 16
+                rank[flush] = flush_ranks[rankbits]
+            np.minimum(best, rank, out=best)
+
+        return best
+
+    def get_rank_class_batch(self, hr):
+        """
+        Vectorized get_rank_class() over an array of hand ranks.
+        """
+        return np.searchsorted(Evaluator.RANK_CLASS_MAXES, hr) + 1
+
+    def get_five_card_rank_percentage_batch(self, hand_rank):
+        """
+        Vectorized get_five_card_rank_percentage() over an array of hand ranks.
+        """
+        return np.asarray(hand_rank, dtype=np.float64) / float(LookupTable.MAX_HIGH_CARD)
+
     def get_rank_class(self, hr):
         """
         Returns the class of hand given the hand hand_rank
         returned from evaluate. 
         """
-        if hr >= 0 and hr < LookupTable.MAX_STRAIGHT_FLUSH:
+        if hr >= 0 and hr <= LookupTable.MAX_STRAIGHT_FLUSH:
             return LookupTable.MAX_TO_RANK_CLASS[LookupTable.MAX_STRAIGHT_FLUSH]
         elif hr <= LookupTable.MAX_FOUR_OF_A_KIND:
             return LookupTable.MAX_TO_RANK_CLASS[LookupTable.MAX_FOUR_OF_A_KIND]
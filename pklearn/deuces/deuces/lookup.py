@@ -1,5 +1,7 @@
 import itertools
+import numpy as np
 from card import Card
+from cache import load_array
 
 class LookupTable(object):
     """
@@ -23,7 +25,18 @@ class LookupTable(object):
     Examples:
     * Royal flush (best hand possible)          => 1
     * 7-5-4-3-2 unsuited (worst hand possible)  => 7462
+
+    Flushes are instead looked up in a flat 8192 entry list indexed 
+    directly by the 13 rank bits of the hand.
+
+    Use LookupTable.shared() rather than the constructor to get the 
+    process-wide table: it is built once, cached to a versioned file 
+    on disk and loaded from there by later runs. A table created before
+    fork() is shared copy-on-write with the child processes.
     """
+    VERSION = 2
+    FLUSH_SIZE = 8192
+
     MAX_STRAIGHT_FLUSH  = 10
     MAX_FOUR_OF_A_KIND  = 166
     MAX_FULL_HOUSE      = 322 
@@ -58,18 +71,51 @@ class LookupTable(object):
         9 : "High Card"
     }
 
+    _shared = None
+
     def __init__(self):
         """
         Calculates lookup tables
         """
-        # create dictionaries
-        self.flush_lookup = {}
+        # create flush list and unsuited dictionary
+        self.flush_lookup = [0] * LookupTable.FLUSH_SIZE
         self.unsuited_lookup = {}
 
         # create the lookup table in piecewise fashion
         self.flushes()  # this will call straights and high cards method,
                         # we reuse some of the bit sequences
         self.multiples()
+        self._to_arrays()
+
+    @staticmethod
+    def shared():
+        """
+        Returns the process-wide lookup table, loading it from the disk 
+        cache (or building and caching it) on first use.
+        """
+        if LookupTable._shared is None:
+            built = []
+            def build(index):
+                if not built:
+                    built.append(LookupTable())
+                return (built[0].flush_array, built[0].unsuited_array)[index]
+
+            table = LookupTable.__new__(LookupTable)
+            table.flush_array = load_array('flush_v%d' % LookupTable.VERSION, lambda: build(0))
+            table.unsuited_array = load_array('unsuited_v%d' % LookupTable.VERSION, lambda: build(1))
+            table.flush_lookup = table.flush_array.tolist()
+            table.unsuited_lookup = dict(table.unsuited_array.tolist())
+            LookupTable._shared = table
+
+        return LookupTable._shared
+
+    def _to_arrays(self):
+        """
+        Stores the tables as arrays: the flush ranks by rank bits, and 
+        (prime product, rank) rows of the unsuited table sorted by product.
+        """
+        self.flush_array = np.array(self.flush_lookup, dtype=np.uint16)
+        self.unsuited_array = np.array(sorted(self.unsuited_lookup.items()), dtype=np.int64)
 
     def flushes(self):
         """
@@ -126,16 +172,14 @@ class LookupTable(object):
         # rank 1 = Royal Flush!
         rank = 1
         for sf in straight_flushes:
-            prime_product = Card.prime_product_from_rankbits(sf)
-            self.flush_lookup[prime_product] = rank
+            self.flush_lookup[sf] = rank
             rank += 1
 
         # we start the counting for flushes on max full house, which
         # is the worst rank that a full house can have (2,2,2,3,3)
         rank = LookupTable.MAX_FULL_HOUSE + 1
         for f in flushes:
-            prime_product = Card.prime_product_from_rankbits(f)
-            self.flush_lookup[prime_product] = rank
+            self.flush_lookup[f] = rank
             rank += 1
 
         # we can reuse these bit sequences for straights
@@ -251,6 +295,9 @@ class LookupTable(object):
         """
         Writes lookup table to disk
         """
+        if isinstance(table, list):
+            table = dict((k, r) for k, r in enumerate(table) if r)
+
         with open(filepath, 'w') as f:
             for prime_prod, rank in table.iteritems():
                 f.write(str(prime_prod) +","+ str(rank) + '\n')
@@ -0,0 +1,205 @@
+import itertools
+import numpy as np
+from card import Card
+from lookup import LookupTable
+from cache import load_array
+
+class SevenCardTable(object):
+    """
+    Direct-index lookup table for 7 card hands.
+
+    Every 7 card hand is reduced to one of two array indices:
+
+    * Flushes: when 5 or more cards share a suit, the 13 rank bits of
+      that suit index a flat 8192 entry table. Quads and full houses
+      are impossible alongside a 7 card flush, so this entry is final.
+    * Everything else: each rank is given a key such that the sum of
+      the keys of any 7 ranks (at most 4 of each) is unique, and that
+      sum indexes the non-flush table.
+
+    Both tables are generated once from LookupTable, stored in a single
+    array file of 16-bit ranks and memory-mapped, so worker processes
+    share one copy of the table.
+    """
+    VERSION = 1
+
+    # rank keys with unique sums over all 49205 7 card rank multisets
+    RANK_KEYS = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+    MAX_KEY = 4 * RANK_KEYS[12] + 3 * RANK_KEYS[11]
+
+    # cards of each suit are counted in their own nibble, a nibble
+    # reaching 5 overflows into its top bit when 3 is added
+    SUIT_COUNT = [0, 0x1, 0x10, 0, 0x100, 0, 0, 0, 0x1000]
+    FLUSH_CHECK = 0x3333
+    FLUSH_BITS = 0x8888
+    FLUSH_SUIT = {
+        0x8 : 0x1000,    # spades
+        0x80 : 0x2000,   # hearts
+        0x800 : 0x4000,  # diamonds
+        0x8000 : 0x8000  # clubs
+    }
+
+    FLUSH_SIZE = LookupTable.FLUSH_SIZE
+
+    _RANK_KEYS = np.array(RANK_KEYS, dtype=np.int64)
+    _SUIT_COUNT = np.array(SUIT_COUNT, dtype=np.int64)
+
+    _shared = None
+
+    def __init__(self):
+        """
+        Maps (or generates) the table.
+        """
+        table = load_array('seven_v%d' % SevenCardTable.VERSION, self.generate)
+        self.flush_lookup = table[:SevenCardTable.FLUSH_SIZE]
+        self.unsuited_lookup = table[SevenCardTable.FLUSH_SIZE:]
+
+    @staticmethod
+    def shared():
+        """
+        Returns the process-wide table, mapping it on first use.
+        """
+        if SevenCardTable._shared is None:
+            SevenCardTable._shared = SevenCardTable()
+        return SevenCardTable._shared
+
+    def evaluate(self, cards):
+        """
+        Returns the rank of a 7 card hand in integer form with a single
+        table lookup.
+        """
+        key = 0
+        suits = 0
+        for c in cards:
+            key += SevenCardTable.RANK_KEYS[(c >> 8) & 0xF]
+            suits += SevenCardTable.SUIT_COUNT[(c >> 12) & 0xF]
+
+        flush = (suits + SevenCardTable.FLUSH_CHECK) & SevenCardTable.FLUSH_BITS
+        if flush:
+            suit = SevenCardTable.FLUSH_SUIT[flush]
+            rankbits = 0
+            for c in cards:
+                if c & suit:
+                    rankbits |= c
+            return int(self.flush_lookup[rankbits >> 16])
+
+        return int(self.unsuited_lookup[key])
+
+    def evaluate_showdown(self, board, hands):
+        """
+        Ranks several 2 card hands against one 5 card board, summing the 
+        board's rank keys, suit counts and per-suit rank bits only once. 
+        Entries of hands that are None are skipped and ranked None.
+        """
+        board_key = 0
+        board_suits = 0
+        suit_bits = {0x1000: 0, 0x2000: 0, 0x4000: 0, 0x8000: 0}
+        for c in board:
+            board_key += SevenCardTable.RANK_KEYS[(c >> 8) & 0xF]
+            board_suits += SevenCardTable.SUIT_COUNT[(c >> 12) & 0xF]
+            suit_bits[c & 0xF000] |= c
+
+        ranks = []
+        for hand in hands:
+            if hand is None:
+                ranks.append(None)
+                continue
+
+            h1, h2 = hand
+            suits = board_suits + SevenCardTable.SUIT_COUNT[(h1 >> 12) & 0xF] \
+                    + SevenCardTable.SUIT_COUNT[(h2 >> 12) & 0xF]
+            flush = (suits + SevenCardTable.FLUSH_CHECK) & SevenCardTable.FLUSH_BITS
+            if flush:
+                suit = SevenCardTable.FLUSH_SUIT[flush]
+                rankbits = suit_bits[suit]
+                if h1 & suit:
+                    rankbits |= h1
+                if h2 & suit:
+                    rankbits |= h2
+                ranks.append(int(self.flush_lookup[rankbits >> 16]))
+            else:
+                key = board_key + SevenCardTable.RANK_KEYS[(h1 >> 8) & 0xF] \
+                      + SevenCardTable.RANK_KEYS[(h2 >> 8) & 0xF]
+                ranks.append(int(self.unsuited_lookup[key]))
+
+        return ranks
+
+    def evaluate_batch(self, cards):
+        """
+        Vectorized evaluate() over an (N, 7) integer array of cards.
+        """
+        cards = np.asarray(cards, dtype=np.int64)
+        key = SevenCardTable._RANK_KEYS[(cards >> 8) & 0xF].sum(axis=1)
+        suit_counts = SevenCardTable._SUIT_COUNT[(cards >> 12) & 0xF]
+        flush = (suit_counts.sum(axis=1) + SevenCardTable.FLUSH_CHECK) & SevenCardTable.FLUSH_BITS
+
+        ranks = self.unsuited_lookup[key].astype(np.int64)
+        rows = np.flatnonzero(flush)
+        if len(rows):
+            # a card is in the flush suit when its suit nibble matches the 
+            # nibble that overflowed
+            suited = (suit_counts[rows] & (flush[rows, None] >> 3)) != 0
+            rankbits = np.bitwise_or.reduce(np.where(suited, cards[rows] >> 16, 0), axis=1)
+            ranks[rows] = self.flush_lookup[rankbits]
+
+        return ranks
+
+    @staticmethod
+    def generate():
+        """
+        Builds the flush and non-flush tables from the 5 card LookupTable,
+        taking the best 5 card subset of every 5, 6 and 7 card flush and
+        of every 7 card rank multiset.
+        """
+        five = LookupTable.shared()
+        table = np.zeros(SevenCardTable.FLUSH_SIZE + SevenCardTable.MAX_KEY + 1, dtype=np.uint16)
+
+        # 1) flushes, indexed by the rank bits of the flush suit
+        for n in (5, 6, 7):
+            for ranks in itertools.combinations(Card.INT_RANKS, n):
+                best = LookupTable.MAX_HIGH_CARD
+                for subset in itertools.combinations(ranks, 5):
+                    rankbits = 0
+                    for r in subset:
+                        rankbits |= 1 << r
+                    best = min(best, five.flush_lookup[rankbits])
+
+                rankbits = 0
+                for r in ranks:
+                    rankbits |= 1 << r
+                table[rankbits] = best
+
+        # 2) everything else, indexed by the sum of rank keys
+        for ranks in SevenCardTable.rank_multisets(7):
+            best = LookupTable.MAX_HIGH_CARD
+            for subset in set(itertools.combinations(ranks, 5)):
+                product = 1
+                for r in subset:
+                    product *= Card.PRIMES[r]
+                best = min(best, five.unsuited_lookup[product])
+
+            key = 0
+            for r in ranks:
+                key += SevenCardTable.RANK_KEYS[r]
+            table[SevenCardTable.FLUSH_SIZE + key] = best
+
+        return table
+
+    @staticmethod
+    def rank_multisets(n, lowest=0, counts=None):
+        """
+        Yields every sorted tuple of n ranks with at most 4 of each rank.
+        """
+        if counts is None:
+            counts = [0] * len(Card.INT_RANKS)
+        if n == 0:
+            yield ()
+            return
+
+        for r in range(lowest, len(Card.INT_RANKS)):
+            if counts[r] == 4:
+                continue
+            counts[r] += 1
+            for rest in SevenCardTable.rank_multisets(n - 1, r, counts):
+                yield (r,) + rest
+            counts[r] -= 1
@@ -0,0 +1,154 @@
+"""
+Enumerates all 133,784,560 seven card hands and builds histograms of their
+ranks and rank classes, e.g. to validate an evaluator against the known
+distribution or to derive tables offline:
+
+    python histogram.py --workers 8 --checkpoint hist.npz
+
+The (52 choose 7) space is split into one shard per pair of lowest cards
+and shards are spread over a process pool. Completed shards are written to
+the checkpoint file every few seconds, so an interrupted run picks up where
+it stopped.
+"""
+import os
+import time
+import argparse
+import itertools
+import numpy as np
+from multiprocessing import Pool
+from deuces import Deck, Evaluator
+from deuces.lookup import LookupTable
+
+# number of 7 card hands in each rank class
+KNOWN_CLASS_COUNTS = {
+    1 : 41584,     # straight flush
+    2 : 224848,    # four of a kind
+    3 : 3473184,   # full house
+    4 : 4047644,   # flush
+    5 : 6180020,   # straight
+    6 : 6461620,   # three of a kind
+    7 : 31433400,  # two pair
+    8 : 58627800,  # pair
+    9 : 23294460   # high card
+}
+TOTAL_HANDS = 133784560
+
+_evaluator = None
+_combos = {}
+
+def shards():
+    """
+    Returns the (i, j) deck indices of the two lowest cards of each shard.
+    """
+    return list(itertools.combinations(range(52), 2))
+
+def count_shard(args):
+    """
+    Ranks every hand whose two lowest cards are deck[i] and deck[j] and
+    returns the shard with its rank histogram.
+    """
+    (i, j), direct = args
+
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = Evaluator(direct=direct)
+
+    deck = np.array(sorted(Deck.GetFullDeck()), dtype=np.int64)
+    histogram = np.zeros(LookupTable.MAX_HIGH_CARD + 1, dtype=np.int64)
+
+    # third card k, and the 4 remaining cards from the indices above k
+    for k in range(j + 1, 48):
+        n = 51 - k
+        if n not in _combos:
+            _combos[n] = np.array(list(itertools.combinations(range(n), 4)), dtype=np.int64)
+        rest = deck[k + 1:][_combos[n]]
+
+        fixed = np.tile(deck[[i, j, k]], (len(rest), 1))
+        cards = np.hstack((fixed, rest))
+        ranks = _evaluator.evaluate_batch(cards[:, :5], cards[:, 5:])
+        histogram += np.bincount(ranks, minlength=len(histogram))
+
+    return (i, j), histogram
+
+def enumerate_hands(workers=1, checkpoint=None, direct=True, interval=10):
+    """
+    Enumerates every 7 card hand and returns the rank histogram, indexed by
+    rank. With a checkpoint path, progress is saved every 'interval' seconds
+    and resumed from that file.
+    """
+    histogram = np.zeros(LookupTable.MAX_HIGH_CARD + 1, dtype=np.int64)
+    done = set()
+    if checkpoint and os.path.exists(checkpoint):
+        saved = np.load(checkpoint)
+        histogram += saved['histogram']
+        done = set(map(tuple, saved['done'].tolist()))
+
+    todo = [(s, direct) for s in shards() if s not in done]
+    pool = Pool(workers) if workers > 1 else None
+    results = pool.imap_unordered(count_shard, todo) if pool else itertools.imap(count_shard, todo)
+
+    last = time.time()
+    for shard, counts in results:
+        histogram += counts
+        done.add(shard)
+        if checkpoint and time.time() - last > interval:
+            save_checkpoint(checkpoint, histogram, done)
+            last = time.time()
+            print "%d/%d shards complete" % (len(done), len(shards()))
+
+    if pool:
+        pool.close()
+        pool.join()
+    if checkpoint:
+        save_checkpoint(checkpoint, histogram, done)
+
+    return histogram
+
+def save_checkpoint(path, histogram, done):
+    """
+    Atomically writes the histogram and the completed shards to path.
+    """
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, histogram=histogram, done=np.array(sorted(done), dtype=np.int64).reshape(-1, 2))
+    os.rename(tmp, path)
+
+def class_histogram(histogram):
+    """
+    Sums a rank histogram into a histogram of rank classes 1-9.
+    """
+    classes = Evaluator().get_rank_class_batch(np.arange(1, len(histogram)))
+    return np.bincount(classes, weights=histogram[1:], minlength=10).astype(np.int64)
+
+def validate(histogram):
+    """
+    Compares a rank histogram to the known class distribution and returns
+    True when they agree.
+    """
+    classes = class_histogram(histogram)
+    ok = histogram.sum() == TOTAL_HANDS
+    for c in sorted(KNOWN_CLASS_COUNTS):
+        match = classes[c] == KNOWN_CLASS_COUNTS[c]
+        ok = ok and match
+        print "%-16s %10d %10d %s" % (LookupTable.RANK_CLASS_TO_STRING[c], classes[c],
+            KNOWN_CLASS_COUNTS[c], "ok" if match else "MISMATCH")
+    print "%-16s %10d %10d" % ("Total", histogram.sum(), TOTAL_HANDS)
+    return ok
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Rank histogram of all 7 card hands.')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--checkpoint', default=None, help='file to save and resume progress')
+    parser.add_argument('--output', default=None, help='file to save the rank histogram (.npy)')
+    parser.add_argument('--combinations', action='store_true',
+        help='rank every 5 card subset instead of using the direct 7 card table')
+    args = parser.parse_args()
+
+    start = time.time()
+    histogram = enumerate_hands(args.workers, args.checkpoint, not args.combinations)
+    print "Enumerated in %.1f seconds.\n" % (time.time() - start)
+
+    if args.output:
+        np.save(args.output, histogram)
+    if not validate(histogram):
+        raise SystemExit(1)
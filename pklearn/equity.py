@@ -0,0 +1,141 @@
+import time
+import itertools
+import numpy as np
+from multiprocessing import Pool
+from deuces.deuces import Evaluator, Deck
+
+_evaluator = None    #evaluator of this process, created on first use
+
+def equity(hands, board=[], nSamples=10000, tBudget=None, maxExhaustive=10000, seed=None, workers=1, chunkSize=10000):
+
+    """
+    This function computes the all-in equity of several hole card pairs against each other.
+
+    Parameters:
+    hands - hole cards of each player as pairs of deuces card integers (list)
+    board - community cards already dealt as deuces card integers (list)
+    nSamples - number of random runouts sampled when runouts are not enumerated (int)
+    tBudget - if set, runouts are sampled until this many seconds have passed instead (float)
+    maxExhaustive - every runout is enumerated when there are at most this many (int)
+    seed - seed of random runouts, results are reproducible for a given seed (int)
+    workers - number of processes sharing the work (int)
+    chunkSize - number of runouts evaluated by a process at a time (int)
+
+    Returns tuple (win, tie, lose) of arrays holding the fraction of runouts in which
+    each player wins outright, ties for the best hand, and loses.
+    """
+
+    hands = [tuple(h) for h in hands]
+    board = list(board)
+    if len(board) > 5: raise Exception('Board cannot have more than 5 cards.')
+    nCards = 5 - len(board)    #cards left to deal
+
+    dealt = set(board)
+    for h in hands: dealt.update(h)
+    if len(dealt) != len(board) + 2 * len(hands): raise Exception('Cards must be distinct.')
+    deck = [c for c in Deck.GetFullDeck() if c not in dealt]
+
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        if _nRunouts(len(deck), nCards) <= maxExhaustive:
+            runouts = list(itertools.combinations(deck, nCards))
+            runouts = np.array(runouts, dtype=np.int64).reshape(len(runouts), nCards)
+            tasks = [(hands, board, runouts[i:i + chunkSize]) for i in range(0, max(len(runouts), 1), chunkSize)]
+            counts = _map(pool, _tallyRunouts, tasks)
+        else:
+            seeds = np.random.RandomState(seed).randint(2**31 - 1, size=2**16)
+            if tBudget is None:
+                sizes = [min(chunkSize, nSamples - i) for i in range(0, nSamples, chunkSize)]
+                tasks = [(hands, board, deck, sizes[i], seeds[i]) for i in range(len(sizes))]
+                counts = _map(pool, _tallySamples, tasks)
+            else:
+                #sample a wave of chunks per worker until time runs out
+                counts = []
+                start = time.time()
+                while time.time() - start < tBudget and len(counts) < len(seeds):
+                    wave = [(hands, board, deck, chunkSize, seeds[len(counts) + i]) for i in range(workers)]
+                    counts.extend(_map(pool, _tallySamples, wave))
+    finally:
+        if pool is not None: 
+            pool.close()
+            pool.join()
+
+    counts = np.sum(counts, axis=0)
+    total = float(counts[:, 0].sum())    #number of runouts
+    return counts[0] / total, counts[1] / total, counts[2] / total
+
+def runoutRanks(hands, board, runouts):
+
+    """
+    This function accepts hole card pairs, a partial board and an array of runouts completing the board,
+    one per row, and returns an array of hand ranks with one row per runout and one column per hand.
+    """
+
+    global _evaluator
+    if _evaluator is None: _evaluator = Evaluator(direct=True)
+
+    runouts = np.asarray(runouts, dtype=np.int64).reshape(len(runouts), 5 - len(board))
+    boards = np.hstack((np.tile(np.array(board, dtype=np.int64), (len(runouts), 1)), runouts))
+
+    ranks = np.empty((len(runouts), len(hands)), dtype=np.int64)
+    for i in range(len(hands)):
+        ranks[:, i] = _evaluator.evaluate_batch(boards, np.tile(np.array(hands[i], dtype=np.int64), (len(runouts), 1)))
+    return ranks
+
+def runouts(deck, nCards, maxRunouts=10000, rng=np.random):
+
+    """
+    This function returns every runout of nCards cards from deck (list of deuces card integers), one per row,
+    if there are at most maxRunouts, and otherwise maxRunouts runouts sampled by rng (RandomState).
+    """
+
+    if _nRunouts(len(deck), nCards) <= maxRunouts:
+        result = list(itertools.combinations(deck, nCards))
+        return np.array(result, dtype=np.int64).reshape(len(result), nCards)
+
+    #first nCards steps of a Fisher-Yates shuffle of a copy of deck per runout
+    decks = np.tile(np.array(deck, dtype=np.int64), (maxRunouts, 1))
+    rows = np.arange(maxRunouts)
+    for j in range(nCards):
+        k = rng.randint(j, len(deck), size=maxRunouts)
+        picked = decks[rows, k]
+        decks[rows, k] = decks[:, j]
+        decks[:, j] = picked
+    return decks[:, :nCards]
+
+def _tally(ranks):
+
+    """ This function counts wins, ties and losses of each hand (column) over runouts (rows) of ranks. """
+
+    best = ranks == ranks.min(axis=1)[:, None]
+    shared = (best.sum(axis=1) > 1)[:, None]
+    win = (best & ~shared).sum(axis=0)
+    tie = (best & shared).sum(axis=0)
+    lose = len(ranks) - win - tie
+    return np.array([win, tie, lose])
+
+def _tallyRunouts(args):
+
+    hands, board, runouts = args
+    return _tally(runoutRanks(hands, board, runouts))
+
+def _tallySamples(args):
+
+    """ This function samples random runouts without replacement from deck and tallies them. """
+
+    hands, board, deck, n, seed = args
+    rng = np.random.RandomState(seed)
+    deck = np.array(deck, dtype=np.int64)
+    order = np.argsort(rng.random_sample((n, len(deck))), axis=1)[:, :5 - len(board)]
+    return _tally(runoutRanks(hands, board, deck[order]))
+
+def _map(pool, f, tasks):
+
+    if pool is None: return [f(t) for t in tasks]
+    return pool.map(f, tasks)
+
+def _nRunouts(nDeck, nCards):
+
+    n = 1
+    for i in range(nCards): n = n * (nDeck - i) / (i + 1)
+    return n
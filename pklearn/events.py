@@ -0,0 +1,93 @@
+class TableListener:
+
+    """
+    This class receives the events of each hand played by a Table it is added to with Table.addListener(). Every
+    event does nothing here, so that a listener only implements the events it needs. Players are identified by
+    their position in the hand, as in GameState, and are also given as Player objects.
+    """
+
+    def startHand(self, players, dealer, deck, smallBlind, bigBlind):
+
+        """ A hand starts between players (list) by position, with dealer position and deck (deck indices). """
+
+    def deal(self, players):
+
+        """ Hole cards have been dealt to players (list) by position, and can be seen with Player.show(). """
+
+    def blind(self, position, player, amount, big):
+
+        """ Player at position posts a blind of amount chips, the big blind if big is True. """
+
+    def action(self, position, player, name, amount, total, allIn):
+
+        """
+        Player at position acts. name is the action string (check, fold, call, raise or bet), amount is the chips
+        called or the increase of the maximum bet by a raise, total is the player's bet in the round after the
+        action and allIn is True if the player is all-in after the action.
+        """
+
+    def uncalled(self, position, player, amount):
+
+        """ amount chips of an uncalled bet are returned to player at position. """
+
+    def endRound(self):
+
+        """ A round of betting has closed. """
+
+    def board(self, cards):
+
+        """ Community cards are flipped, cards (list of Cards) are all community cards so far. """
+
+    def award(self, position, player, amount, pot, kind):
+
+        """
+        Player at position wins amount chips from pot, counted from 0 for the main pot. kind is 'uncontested' if
+        all other players folded, 'pot' for a share of a pot won at showdown, 'odd' for odd chips of a split pot and
+        'equity' for the expected chips of a hand fast-forwarded by a Table with fastForward set to 'stacks'.
+        """
+
+    def endHand(self, players):
+
+        """ The hand has ended, players (list) by position have their final stacks. """
+
+class Narrator(TableListener):
+
+    """ This class narrates hands by printing each event, as done by Table when playing hands with vocal set. """
+
+    def deal(self, players):
+
+        for p in players:
+            hole = p.show()
+            print p.getName() + '(' + str(p.getStack()) + ')', 'dealt', hole[0], 'and', hole[1]
+        print
+
+    def blind(self, position, player, amount, big):
+
+        if not big: print player.getName(), 'posts small blind of', amount
+        else: print player.getName(), 'posts big blind of', amount
+
+    def action(self, position, player, name, amount, total, allIn):
+
+        if name == 'check': print player.getName(), 'checks.'
+        elif name == 'fold': print player.getName(), 'folds.'
+        elif name == 'call':
+            if allIn: print player.getName(), 'all-in calls with', amount
+            else: print player.getName(), 'calls', amount
+        elif not allIn: print player.getName(), 'raises', amount, 'to', total
+        else: print player.getName(), 'raises all-in', amount, 'to', total
+
+    def uncalled(self, position, player, amount): print amount, 'uncalled chips return to', player.getName()
+
+    def endRound(self): print
+
+    def board(self, cards): print [str(c) for c in cards]
+
+    def award(self, position, player, amount, pot, kind):
+
+        if kind == 'uncontested': print player.getName(), 'wins', amount
+        elif kind == 'odd': print player.getName(), 'wins', amount, 'odd chips'
+        elif kind == 'equity': print player.getName(), 'wins', amount, 'in expectation'
+        elif pot == 0: print player.getName(), 'wins', amount, 'from main pot'
+        else: print player.getName(), 'wins', amount, 'from side pot'
+
+    def endHand(self, players): print
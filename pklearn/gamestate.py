@@ -1,39 +1,74 @@
-class GameState:
+class GameState(object):
 
-    """This class is responisble for holding all game data that is accessible to Players"""
+    """
+    This class is responisble for holding all game data that is accessible to Players. A Table resets one
+    GameState in place at the beginning of each hand, so a Player that keeps a GameState must copy it.
+    """
+
+    __slots__ = ('toCall', 'minRaise', 'numP', 'bets', 'currBets', 'folded', 'allIn', 'cards', 'actor',
+                 'numRaises', 'maxBet', 'nActive')
 
     def __init__(self, players):
 
+        self.bets = []
+        self.currBets = []
+        self.numRaises = []
+        self.folded = set()
+        self.allIn = set()
+        self.cards = []
+        self.reset(players)
+
+    def reset(self, players):
+
+        """ This method resets the GameState for a new hand between players, reusing its lists and sets. """
+
         #amount of chips necessary to call without going all-in
-        self.toCall = None                           
-        
+        self.toCall = None
+
         #minimum raise size, player must increase bet to minRaise to raise
-        self.minRaise = None                         
-        
+        self.minRaise = None
+
         #number of players in hand
-        self.numP = len(players)               
-        
+        self.numP = len(players)
+
         #total contribution of each player to completed betting rounds
-        #by position of player in self._playing  
+        #by position of player in self._playing
         #sum of bets is total pot excluding current betting round
-        self.bets = [0 for p in players]       
-        
+        self.bets[:] = [0] * self.numP
+
         #total contribution of each player to pot of current betting round
         #sum of currBets is total pot of current round
         #sum of bets and currBets is total pot
-        self.currBets = [0 for p in players]   
-        
-        #list of positions where players have folded
-        self.folded = []
-        
-        #list of positions where players are all-in
-        self.allIn = []                                    
-        
+        self.currBets[:] = [0] * self.numP
+
+        #set of positions where players have folded
+        self.folded.clear()
+
+        #set of positions where players are all-in
+        self.allIn.clear()
+
         #face up community cards
-        self.cards = []                              
-        
+        del self.cards[:]
+
         #index of player who is currently acting in self._playing
-        self.actor = None                             
+        self.actor = None
 
         #number of raises this round by position of player
-        self.numRaises = [0 for p in players]
\ No newline at end of file
+        self.numRaises[:] = [0] * self.numP
+
+        #largest value in currBets
+        self.maxBet = 0
+
+        #number of players who have neither folded nor gone all-in
+        self.nActive = self.numP
+
+    def copy(self):
+
+        """ This method returns a copy of the GameState which is unaffected by later changes to this one. """
+
+        s = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            value = getattr(self, name)
+            if type(value) in (list, set): value = type(value)(value)
+            setattr(s, name, value)
+        return s
@@ -0,0 +1,185 @@
+import numpy as np
+import os
+from events import TableListener
+from lockstep import CHECK, FOLD, CALL, RAISE
+
+ACTION_CODES = {'check': CHECK, 'fold': FOLD, 'call': CALL, 'raise': RAISE, 'bet': RAISE}
+
+MAGIC = 'PKLHANDS'
+VERSION = 2
+HEADER_SIZE = 64
+HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('maxSeats', '<u4'), ('maxActions', '<u4'),
+                   ('chipBytes', '<u4'), ('nRecords', '<u8')])
+
+def recordDtype(maxSeats=6, maxActions=16, chipBytes=2):
+
+    """
+    This function returns the structured dtype of one hand record of a HandLog. Players are identified by their
+    position in the hand, as in GameState. Chip counts are unsigned integers of chipBytes bytes. Each action is one
+    byte holding the position of its actor and its code, see unpackActions(). Unused entries of each array are
+    padded with zeros, and of cards with -1. With the defaults a record takes 96 bytes.
+    """
+
+    chips = '<u' + str(chipBytes)
+    return np.dtype([
+        ('numP', '<u1'),                          #number of players in hand
+        ('dealer', '<u1'),                        #position of dealer
+        ('nActions', '<u1'),                      #number of actions up to 255, only the first maxActions are recorded
+        ('smallBlind', chips),
+        ('bigBlind', chips),
+        ('cards', '<i1', (2 * maxSeats + 5,)),    #deck indices of hole cards by position then board, as dealt
+        ('stacks', chips, (maxSeats,)),           #stack of each position at start of hand
+        ('payouts', chips, (maxSeats,)),          #chips won from pot by each position
+        ('actions', '<u1', (maxActions,)),        #position of actor << 2 | code of each action, see ACTION_CODES
+        ('amounts', chips, (maxActions,))         #total bet of actor in current round after each action
+    ])
+
+def unpackActions(actions):
+
+    """ This function returns the positions of the actors and the action codes of packed actions (array). """
+
+    return actions >> 2, actions & 3
+
+class HandLog(TableListener):
+
+    """
+    This class writes a binary hand history of fixed size records, one per hand. Records are buffered and
+    appended to the file in blocks through a memory map, and the number of complete records is kept in a
+    fixed size header. Add a HandLog to a Table with Table.addListener() to record every hand it plays, and read
+    records back with readHandLog() or iterHandLog().
+    """
+
+    def __init__(self, path, maxSeats=6, maxActions=16, chipBytes=2, bufferSize=4096):
+
+        """
+        Constructor accepts path of log file (str), maximum number of players (int) and of recorded actions (int)
+        per hand, bytes of each chip count (2 or 4) and number of records buffered between writes (int). The
+        chips at a table must fit in chipBytes bytes. An existing log at path is appended to.
+        """
+
+        if maxSeats > 64: raise Exception('Hand log has at most 64 seats.')
+        if chipBytes not in (2, 4): raise Exception('Chip counts must take 2 or 4 bytes.')
+
+        self._path = path
+        self._dtype = recordDtype(maxSeats, maxActions, chipBytes)
+        self._maxSeats = maxSeats
+        self._maxActions = maxActions
+        self._maxChips = 2**(8 * chipBytes) - 1
+
+        if os.path.exists(path):
+            header = _readHeader(path)
+            if header['maxSeats'] != maxSeats or header['maxActions'] != maxActions or \
+               header['chipBytes'] != chipBytes:
+                raise Exception('Existing hand log has a different number of seats, actions or chip bytes.')
+            self._nWritten = int(header['nRecords'])
+        else:
+            header = np.zeros(1, dtype=HEADER)[0]
+            header['magic'] = MAGIC
+            header['version'] = VERSION
+            header['maxSeats'] = maxSeats
+            header['maxActions'] = maxActions
+            header['chipBytes'] = chipBytes
+            with open(path, 'wb') as f: f.write(header.tobytes().ljust(HEADER_SIZE, '\0'))
+            self._nWritten = 0
+
+        self._buffer = np.zeros(bufferSize, dtype=self._dtype)
+        self._n = 0    #number of records in self._buffer
+        self._actions = []
+        self._amounts = []
+        self._payouts = []
+
+    def startHand(self, players, dealer, deck, smallBlind, bigBlind):
+
+        """ This method starts the record of a hand. """
+
+        numP = len(players)
+        if numP > self._maxSeats: raise Exception('Hand has more players than hand log has seats.')
+        stacks = [p.getStack() for p in players]
+        #every bet and payout is at most the chips in play
+        if sum(stacks) > self._maxChips: raise Exception('Chips in hand do not fit in hand log, use more chip bytes.')
+
+        r = self._buffer[self._n]
+        r['numP'] = numP
+        r['dealer'] = dealer
+        r['smallBlind'] = smallBlind
+        r['bigBlind'] = bigBlind
+        r['cards'][:2 * numP + 5] = deck[:2 * numP + 5]
+        r['cards'][2 * numP + 5:] = -1
+        r['stacks'][:numP] = stacks
+        r['stacks'][numP:] = 0
+        del self._actions[:], self._amounts[:]
+        self._payouts[:] = [0] * numP
+
+    def action(self, position, player, name, amount, total, allIn):
+
+        self._actions.append(position << 2 | ACTION_CODES[name])
+        self._amounts.append(total)
+
+    def award(self, position, player, amount, pot, kind): self._payouts[position] += amount
+
+    def endHand(self, players):
+
+        """ This method completes the record of the hand and buffers it. """
+
+        r = self._buffer[self._n]
+        numP = len(self._payouts)
+        r['payouts'][:numP] = self._payouts
+        r['payouts'][numP:] = 0
+        n = len(self._actions)
+        k = min(n, self._maxActions)
+        r['nActions'] = min(n, 255)
+        for field, values in (('actions', self._actions), ('amounts', self._amounts)):
+            r[field][:k] = values[:k]
+            r[field][k:] = 0
+
+        self._n += 1
+        if self._n == len(self._buffer): self.flush()
+
+    def flush(self):
+
+        """ This method appends buffered records to the log file and updates its header. """
+
+        if self._n == 0: return
+
+        offset = HEADER_SIZE + self._nWritten * self._dtype.itemsize
+        with open(self._path, 'r+b') as f: f.truncate(offset + self._n * self._dtype.itemsize)
+        records = np.memmap(self._path, dtype=self._dtype, mode='r+', offset=offset, shape=(self._n,))
+        records[:] = self._buffer[:self._n]
+        records.flush()
+        del records
+
+        self._nWritten += self._n
+        self._n = 0
+        with open(self._path, 'r+b') as f:
+            f.seek(HEADER.fields['nRecords'][1])
+            f.write(np.array(self._nWritten, dtype='<u8').tobytes())
+
+    def close(self): self.flush()
+
+    def __len__(self): return self._nWritten + self._n
+
+    def getPath(self): return self._path
+
+def _readHeader(path):
+
+    with open(path, 'rb') as f: header = np.frombuffer(f.read(HEADER_SIZE)[:HEADER.itemsize], dtype=HEADER)[0]
+    if header['magic'] != MAGIC: raise Exception('File is not a hand log.')
+    if header['version'] != VERSION: raise Exception('Unsupported hand log version.')
+    return header
+
+def readHandLog(path):
+
+    """ This function returns every record of the hand log at path as a read-only memory mapped structured array. """
+
+    header = _readHeader(path)
+    dtype = recordDtype(int(header['maxSeats']), int(header['maxActions']), int(header['chipBytes']))
+    n = int(header['nRecords'])
+    if n == 0: return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(n,))
+
+def iterHandLog(path, chunkSize=10000):
+
+    """ This function yields the records of the hand log at path as structured arrays of at most chunkSize hands. """
+
+    records = readHandLog(path)
+    for i in range(0, len(records), chunkSize): yield np.array(records[i:i + chunkSize])
@@ -0,0 +1,380 @@
+import numpy as np
+from card import Card
+from dealer import Dealer
+from gamestate import GameState
+from deuces.deuces import Evaluator
+
+CHECK, FOLD, CALL, RAISE = range(4)    #integer codes of actions
+
+class Lockstep:
+
+    """
+    This class simulates a hand at many tables at once, with the same rules as Table.playHand. Every table seats
+    the same Players, one per seat, but keeps its own stacks. Stacks, bets, folded/all-in flags and cards are
+    held in arrays with one row per table and one column per position, betting rounds and pot settlement are
+    applied to all tables with array operations, and each step requests the decisions of all tables at which
+    the same Player is to act with a single Player.decide() call.
+
+    Given the same sequence of decks, a Lockstep of a single table produces the same hands as Table.playHand.
+    """
+
+    def __init__(self, players, nTables, smallBlind, bigBlind, maxBuyIn, dealer=None):
+
+        """
+        Constructor accepts the Players seated at every table (list), the number of tables (int), blinds and
+        maximum buy in as integers and a Dealer which deals the deck of each table in table order.
+        """
+
+        if type(smallBlind) != int or type(bigBlind) != int or type(maxBuyIn) != int:
+            raise Exception('Parameters must be integer number of chips.')
+
+        self._players = list(players)
+        self._nTables = nTables
+        self._smallBlind = smallBlind
+        self._bigBlind = bigBlind
+        self._maxBuyIn = maxBuyIn
+        self._cardDealer = dealer if dealer is not None else Dealer()
+        self._eval = Evaluator(direct=True)
+
+        nSeats = len(self._players)
+        self._stacks = np.zeros((nTables, nSeats), dtype=np.int64)    #stack of each seat at each table
+        self._boughtIn = np.zeros((nTables, nSeats), dtype=np.int64)  #chips bought in for since last buy in
+        self._winnings = np.zeros((nTables, nSeats), dtype=np.int64)  #chips won by each seat at previous buy ins
+
+        #same bookkeeping as Table, by seat: playing seats in order of position, bankrupt seats, dealer position
+        self._playing = [[] for t in range(nTables)]
+        self._sitOut = [range(nSeats) for t in range(nTables)]
+        self._dealer = [0 for t in range(nTables)]
+
+        self._cards = Card.DECK    #card of each deck index
+        self._ints = np.array([c.toInt() for c in self._cards], dtype=np.int64)
+
+    def buyIn(self):
+
+        """ This method cashes out every stack at every table and buys in again for the maximum buy in. """
+
+        self._winnings += self._stacks - self._boughtIn
+        self._stacks[:] = self._maxBuyIn
+        self._boughtIn[:] = self._maxBuyIn
+
+    def playHand(self):
+
+        """ This method simulates one hand at every table and returns a boolean array of which tables played. """
+
+        played = np.zeros(self._nTables, dtype=bool)
+        for t in range(self._nTables):
+            for s in self._sitOut[t][:]:
+                if self._stacks[t, s] >= self._bigBlind:
+                    if self._stacks[t, s] > self._maxBuyIn:
+                        raise Exception('Player\'s stack is greater than maximum buy in.')
+                    self._playing[t].append(s)
+                    self._sitOut[t].remove(s)
+            played[t] = len(self._playing[t]) > 1
+
+        self._rows = np.flatnonzero(played)
+        if len(self._rows) == 0: return played
+
+        self._newHand()
+        self._preFlop()
+        self._flip(3)
+        self._flip(1)
+        self._flip(1)
+        self._payWinners()
+        self._endHand()
+        return played
+
+    def _newHand(self):
+
+        """ This method sets up the arrays of the hand, by position, for every table that plays. """
+
+        n = len(self._rows)
+        S = len(self._players)
+        self._numP = np.array([len(self._playing[t]) for t in self._rows])
+        self._seat = np.zeros((n, S), dtype=np.int64)    #seat of each position
+        self._inHand = np.zeros((n, S), dtype=bool)      #True for positions that exist at a table
+        for i, t in enumerate(self._rows):
+            self._seat[i, :self._numP[i]] = self._playing[t]
+            self._inHand[i, :self._numP[i]] = True
+
+        self._stack = np.where(self._inHand, self._stacks[self._rows[:, None], self._seat], 0)
+        self._dealerPos = np.array([self._dealer[t] for t in self._rows])
+        self._bets = np.zeros((n, S), dtype=np.int64)
+        self._currBets = np.zeros((n, S), dtype=np.int64)
+        self._numRaises = np.zeros((n, S), dtype=np.int64)
+        self._folded = np.zeros((n, S), dtype=bool)
+        self._allIn = np.zeros((n, S), dtype=bool)
+        self._minRaise = np.zeros(n, dtype=np.int64)
+        self._toCall = np.zeros(n, dtype=np.int64)
+        self._actor = np.zeros(n, dtype=np.int64)
+
+        #deal: position p is dealt deck[2p] and deck[2p + 1], board follows the hole cards
+        self._decks = np.array([self._cardDealer.nextDeck() for t in self._rows], dtype=np.int64)
+        self._nBoard = np.zeros(n, dtype=np.int64)
+        self._boardStart = 2 * self._numP
+        self._records = []    #(row, position, stack, features) of each decision
+
+    def _preFlop(self):
+
+        """ This method posts the blinds and commences betting at every table. """
+
+        rows = np.arange(len(self._rows))
+        numP, dealer = self._numP, self._dealerPos
+        self._minRaise[:] = 2 * self._bigBlind
+
+        headsUp = numP == 2
+        sbPos = np.where(headsUp, dealer, (dealer + 1) % numP)
+        bbPos = np.where(headsUp, (dealer + 1) % numP, (dealer + 2) % numP)
+        self._actor = np.where(headsUp, dealer, (dealer + 3) % numP)
+
+        self._currBets[rows, sbPos] += self._smallBlind
+        self._stack[rows, sbPos] -= self._smallBlind
+        self._currBets[rows, bbPos] += self._bigBlind
+        self._stack[rows, bbPos] -= self._bigBlind
+
+        self._openBetting(rows)
+
+    def _flip(self, numCards):
+
+        """ This method flips numCards cards at every table where more than one player remains and commences betting. """
+
+        rows = np.flatnonzero(self._folded.sum(axis=1) + 1 != self._numP)
+        if len(rows) == 0: return
+
+        self._minRaise[rows] = self._bigBlind
+        self._nBoard[rows] += numCards
+        self._actor[rows] = (self._dealerPos[rows] + 1) % self._numP[rows]
+        self._openBetting(rows)
+
+    def _openBetting(self, rows):
+
+        """ The method runs a round of betting at the tables of rows, one iteration of the betting loop per step. """
+
+        lastRaiser = self._actor.copy()
+        t = np.zeros(len(self._actor), dtype=np.int64)
+        isOpen = np.zeros(len(self._actor), dtype=bool)
+        isOpen[rows] = True
+
+        while isOpen.any():
+            rows = np.flatnonzero(isOpen)
+            t[rows] += 1
+            actor = self._actor[rows]
+            currBets = self._currBets[rows]
+            maxBet = currBets.max(axis=1)
+
+            #close betting when the last raiser is reached, or when no further calls are possible
+            canAct = self._inHand[rows] & ~self._folded[rows] & ~self._allIn[rows]
+            nCanAct = canAct.sum(axis=1)
+            sole = np.argmax(canAct, axis=1)
+            close = ((actor == lastRaiser[rows]) & (t[rows] > 1)) | (nCanAct == 0) \
+                    | ((nCanAct == 1) & (currBets[np.arange(len(rows)), sole] == maxBet))
+            isOpen[rows[close]] = False
+            rows, actor, maxBet = rows[~close], actor[~close], maxBet[~close]
+
+            #skip players who have folded or are all in
+            skip = self._folded[rows, actor] | self._allIn[rows, actor]
+            act = rows[~skip]
+            self._toCall[act] = maxBet[~skip] - self._currBets[act, self._actor[act]]
+
+            if len(act):
+                codes, amounts = self._requestActions(act)
+                raised = self._parseActions(act, codes, amounts)
+                lastRaiser[act[raised]] = self._actor[act[raised]]
+
+            self._actor[rows] = (self._actor[rows] + 1) % self._numP[rows]
+
+        self._returnUncalled(np.flatnonzero(t))
+
+    def _requestActions(self, rows):
+
+        """
+        This method builds a GameState for the actor at each table of rows, requests the actions of each
+        Player for all of its tables with one call and returns the action codes and amounts.
+        """
+
+        codes = np.zeros(len(rows), dtype=np.int64)
+        amounts = np.zeros(len(rows), dtype=np.int64)
+        actors = self._actor[rows]
+        seats = self._seat[rows, actors]
+
+        for s in np.unique(seats):
+            idx = np.flatnonzero(seats == s)
+            gameStates = [self._gameState(rows[i]) for i in idx]
+            holeCards = [self._holeCards(rows[i], actors[i]) for i in idx]
+            stacks = [int(self._stack[rows[i], actors[i]]) for i in idx]
+
+            actions, features = self._players[s].decide(gameStates, holeCards, stacks)
+            for j, i in enumerate(idx):
+                self._records.append((rows[i], actors[i], stacks[j], features[j]))
+                a = actions[j][0]
+                if a == 'check': codes[i] = CHECK
+                elif a == 'fold': codes[i] = FOLD
+                elif a == 'call': codes[i] = CALL
+                elif a == 'raise' or a == 'bet':
+                    codes[i] = RAISE
+                    amounts[i] = actions[j][1]
+                else: raise Exception('Invalid player action.')
+
+        return codes, amounts
+
+    def _parseActions(self, rows, codes, amounts):
+
+        """ This method applies the actions of the actors at rows, like Table._parseAction. Returns mask of raises. """
+
+        actor = self._actor[rows]
+        m = self._currBets[rows].max(axis=1)    #largest contribution that any player has in current pot
+        currentBet = self._currBets[rows, actor]
+        stack = self._stack[rows, actor]
+
+        if ((codes == CHECK) & (currentBet < m)).any(): raise Exception('Player must call to remain in the pot.')
+
+        fold = codes == FOLD
+        self._folded[rows[fold], actor[fold]] = True
+
+        call = codes == CALL
+        if (call & (self._toCall[rows] == 0)).any(): raise Exception('Player called a bet of 0 chips. Did you mean to check?')
+        allInCall = call & (stack <= self._toCall[rows])
+        newBet = np.where(allInCall, currentBet + stack, m)
+        self._currBets[rows[call], actor[call]] = newBet[call]
+        self._stack[rows[call], actor[call]] -= (newBet - currentBet)[call]
+        self._allIn[rows[allInCall], actor[allInCall]] = True
+
+        raised = codes == RAISE
+        if (raised & (amounts < self._minRaise[rows])).any(): raise Exception('Raise amount is less than minimum raise.')
+        if (raised & (amounts - currentBet > stack)).any(): raise Exception('Requested chips is greater than stack size.')
+        r, a = rows[raised], actor[raised]
+        self._minRaise[r] = 2 * amounts[raised] - m[raised]    #player must raise by twice as much as last raise
+        self._currBets[r, a] = amounts[raised]
+        self._stack[r, a] -= (amounts - currentBet)[raised]
+        self._numRaises[r, a] += 1
+        self._allIn[r, a] |= self._stack[r, a] == 0
+
+        return raised
+
+    def _returnUncalled(self, rows):
+
+        """ This method returns uncalled chips to the raiser and adds the bets of the round to the pot. """
+
+        currBets = np.where(self._inHand[rows], self._currBets[rows], -1)
+        maxBet = currBets.max(axis=1)
+        isMax = currBets == maxBet[:, None]
+        belowMax = np.where(isMax, -1, currBets).max(axis=1)
+        single = (isMax.sum(axis=1) == 1) & (belowMax >= 0)
+        r = rows[single]
+        raiser = np.argmax(isMax[single], axis=1)
+        self._stack[r, raiser] += maxBet[single] - belowMax[single]
+        self._currBets[r, raiser] = belowMax[single]
+
+        self._bets += self._currBets
+        self._currBets[:] = 0
+        self._numRaises[:] = 0
+
+    def _payWinners(self):
+
+        """ This method distributes the pot of every table to the winner(s), side pots included. """
+
+        n, S = self._bets.shape
+        rows = np.arange(n)
+        live = self._inHand & ~self._folded
+
+        #rank hands where the board was completed, otherwise a single player remains
+        ranks = np.zeros((n, S), dtype=np.int64)
+        show = np.flatnonzero(self._nBoard == 5)
+        if len(show):
+            decks = self._decks[show]
+            cols = self._boardStart[show][:, None] + np.arange(5)
+            board = self._ints[decks[np.arange(len(show))[:, None], cols]]
+            for p in range(S):
+                has = np.flatnonzero(live[show, p])
+                if len(has) == 0: continue
+                hole = self._ints[decks[has][:, [2 * p, 2 * p + 1]]]
+                ranks[show[has], p] = self._eval.evaluate_batch(board[has], hole)
+
+        #one side pot per iteration, at most one per position
+        bets = self._bets
+        while True:
+            eligible = live & (bets != 0)
+            active = np.flatnonzero(eligible.any(axis=1))
+            if len(active) == 0: break
+
+            el = eligible[active]
+            minLiveBet = np.where(el, bets[active], np.iinfo(np.int64).max).min(axis=1)
+            minRank = np.where(el, ranks[active], np.iinfo(np.int64).max).min(axis=1)
+            winners = el & (ranks[active] == minRank[:, None])
+            nWinners = winners.sum(axis=1)
+
+            contribution = np.minimum(bets[active], minLiveBet[:, None])
+            bets[active] -= contribution
+            subPot = contribution.sum(axis=1)
+            winnings = subPot // nWinners
+            self._stack[active] += winners * winnings[:, None]
+
+            #give odd chips to player in earliest position
+            odd = subPot - winnings * nWinners
+            numP = self._numP[active]
+            order = (self._dealerPos[active][:, None] + 1 + np.arange(S)) % numP[:, None]
+            first = order[np.arange(len(active)), np.argmax(winners[np.arange(len(active))[:, None], order], axis=1)]
+            self._stack[active, first] += odd
+
+    def _endHand(self):
+
+        """ This method stores stacks and experience and moves the dealer chip, like Table.playHand. """
+
+        for i, t in enumerate(self._rows):
+            self._stacks[t, self._seat[i, :self._numP[i]]] = self._stack[i, :self._numP[i]]
+
+        #label each decision with the change in stack since it was made
+        experience = {}
+        for row, pos, stack, features in self._records:
+            s = self._seat[row, pos]
+            e = experience.setdefault(s, ([], [], []))
+            e[0].append(features)
+            e[1].append(stack)
+            e[2].append(int(self._stack[row, pos]) - stack)
+        for s in sorted(experience): self._players[s].addExperience(*experience[s])
+
+        for i, t in enumerate(self._rows):
+            playing, numP = self._playing[t], self._numP[i]
+
+            #find next dealer
+            dealerPos = (self._dealer[t] + 1) % numP
+            while self._stacks[t, playing[dealerPos]] < self._bigBlind: dealerPos = (dealerPos + 1) % numP
+            dealer = playing[dealerPos]
+
+            #remove players who have gone bankrupt
+            for s in playing[:]:
+                if self._stacks[t, s] < self._bigBlind:
+                    playing.remove(s)
+                    self._sitOut[t].append(s)
+
+            self._dealer[t] = playing.index(dealer)
+
+    def _gameState(self, row):
+
+        """ This method returns the GameState of the table at row, as seen by its current actor. """
+
+        numP = self._numP[row]
+        s = GameState(range(numP))
+        s.toCall = int(self._toCall[row])
+        s.minRaise = int(self._minRaise[row])
+        s.bets = self._bets[row, :numP].tolist()
+        s.currBets = self._currBets[row, :numP].tolist()
+        s.folded = set(np.flatnonzero(self._folded[row, :numP]).tolist())
+        s.allIn = set(np.flatnonzero(self._allIn[row, :numP]).tolist())
+        start = self._boardStart[row]
+        s.cards = [self._cards[c] for c in self._decks[row, start:start + self._nBoard[row]]]
+        s.actor = int(self._actor[row])
+        s.numRaises = self._numRaises[row, :numP].tolist()
+        s.maxBet = max(s.currBets)
+        s.nActive = numP - len(s.folded | s.allIn)
+        return s
+
+    def _holeCards(self, row, pos):
+        return (self._cards[self._decks[row, 2 * pos]], self._cards[self._decks[row, 2 * pos + 1]])
+
+    def getStacks(self): return self._stacks.copy()
+
+    def getWinnings(self): return self._winnings + self._stacks - self._boughtIn
+
+    def getPlayers(self): return self._players[:]
+
+    def getParams(self): return (self._smallBlind, self._bigBlind, self._maxBuyIn)
@@ -0,0 +1,120 @@
+import numpy as np
+
+class ExperienceMemory:
+
+    """
+    This class stores a Player's features, the stack size at each and their labels in preallocated arrays used
+    as a ring buffer, so that the oldest samples are overwritten once capacity is reached. Features of the
+    current hand are pending until they are labelled at the end of the hand, in place. Arrays are allocated when
+    the first features are stored, when the number of features is known.
+    """
+
+    def __init__(self, capacity):
+
+        """ Constructor accepts the maximum number of samples to store (int). """
+
+        self._capacity = capacity
+        self._features = None    #(capacity x number of features) array
+        self._stacks = None
+        self._labels = None
+        self._head = 0           #row of next sample
+        self._size = 0           #number of samples stored
+        self._pending = []       #rows of samples which have not been labelled
+        self._added = 0          #samples ever stored
+        self._marked = 0         #samples stored before last mark()
+        self._firstPending = 0   #samples stored before oldest pending sample
+
+    def _allocate(self, nFeatures):
+
+        self._features = np.empty((self._capacity, nFeatures))
+        self._stacks = np.empty(self._capacity)
+        self._labels = np.empty(self._capacity)
+
+    def add(self, features, stack):
+
+        """ This method stores features (list) seen with stack size stack, to be labelled by label(). """
+
+        if self._capacity == 0: return
+        if self._features is None: self._allocate(len(features))
+
+        if not self._pending: self._firstPending = self._added
+        self._features[self._head] = features
+        self._stacks[self._head] = stack
+        self._pending.append(self._head)
+        self._head = (self._head + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
+        self._added += 1
+
+    def label(self, stack):
+
+        """ This method labels each pending sample with the change from its stack size to stack. """
+
+        for i in self._pending: self._labels[i] = stack - self._stacks[i]
+        del self._pending[:]
+
+    def extend(self, features, stacks, labels):
+
+        """ This method stores labelled samples, given as parallel sequences of features, stack sizes and labels. """
+
+        n = len(labels)
+        if self._capacity == 0 or n == 0: return
+        features = np.asarray(features)[-self._capacity:]
+        if self._features is None: self._allocate(features.shape[1])
+
+        rows = (self._head + np.arange(min(n, self._capacity))) % self._capacity
+        self._features[rows] = features
+        self._stacks[rows] = np.asarray(stacks)[-self._capacity:]
+        self._labels[rows] = np.asarray(labels)[-self._capacity:]
+        self._head = (rows[-1] + 1) % self._capacity
+        self._size = min(self._size + n, self._capacity)
+        self._added += n
+
+    def arrays(self):
+
+        """
+        This method returns the features and labels of every labelled sample as arrays, in storage order. They
+        are views of the buffer unless samples are pending, in which case pending samples are left out of copies.
+        """
+
+        if self._features is None: return np.empty((0, 0)), np.empty(0)
+        if not self._pending: return self._features[:self._size], self._labels[:self._size]
+        keep = np.ones(self._size, dtype=bool)
+        keep[self._pending] = False
+        return self._features[:self._size][keep], self._labels[:self._size][keep]
+
+    def recent(self):
+
+        """
+        This method returns copies of the features, stack sizes and labels of the labelled samples stored since the
+        last call of mark() which have not been overwritten, in storage order.
+        """
+
+        n = min(self._added - self._marked, self._size)
+        if self._features is None or n == 0: return np.empty((0, 0)), np.empty(0), np.empty(0)
+        rows = (self._head - n + np.arange(n)) % self._capacity
+        if self._pending: rows = rows[~np.in1d(rows, self._pending)]
+        return self._features[rows], self._stacks[rows], self._labels[rows]
+
+    def mark(self):
+
+        """ This method marks every sample stored before the oldest pending sample as returned by recent(). """
+
+        self._marked = self._firstPending if self._pending else self._added
+
+    def _ordered(self, a):
+
+        """ This method returns a copy of the stored rows of a, oldest first. """
+
+        if a is None: return np.empty(0)
+        if self._size < self._capacity: return a[:self._size].copy()
+        return np.concatenate((a[self._head:], a[:self._head]))
+
+    def getFeatures(self): return self._ordered(self._features)
+
+    def getStacks(self): return self._ordered(self._stacks)
+
+    def getLabels(self): return self._ordered(self._labels)
+
+    def getCapacity(self): return self._capacity
+
+    def __len__(self): return self._size
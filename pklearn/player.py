@@ -1,5 +1,9 @@
+import copy
+import time
 import random
 import numpy as np
+from memory import ExperienceMemory
+from cache import PredictionCache, canonicalCards
 
 class Player:
 
@@ -8,7 +12,7 @@ class Player:
     receiving GameStates and returning actions.
     """
 
-    def __init__(self, name, bankroll, nRaises, memory, rFactor=None, reg=None):
+    def __init__(self, name, bankroll, nRaises, memory, rFactor=None, reg=None, cacheSize=0):
 
         """ 
         Parameters
@@ -19,20 +23,25 @@ class Player:
         memory - player forgets oldest stored features/labels that exceed memory in quantity (int)
         rFactor - each raise choice is rFactor times the next largest raise choice (float)
         reg - machine learning regressor, must be sklearn or implement 'fit' and 'predict'
+        cacheSize - number of decisions whose predictions are cached, no cache if 0 (int). A player with a cache
+                    decides and learns from features of its cards with suits relabeled canonically
         """
         
         self._name = name            #for distinction from other players
         self._fit = False            #True when self._reg has been fit
         self._bankroll = bankroll    #total wealth of player
         self._stack = 0              #chips that player has on table
-        self._features = []          #features associated with each gameState seen
-        self._stacks = []            #stack size at each time that features are recorded
-        self._labels = []            #result of each hand played
-        self._memory = memory        #max number of features, stacks, and labels to store
+        self._experience = ExperienceMemory(memory)    #features of each gameState seen, stack size and result
         self._reg = reg              #machine learning regressor which predicts return on action
         
         self._train = True           #player will not update regressor if self._train is False
 
+        self._nDecisions = 0         #decisions made
+        self._nPredicts = 0          #calls of self._reg.predict made to decide
+        self._tPredict = 0.          #seconds spent in self._reg.predict to decide
+        self._cache = PredictionCache(cacheSize) if cacheSize > 0 else None    #predictions by features
+        self._nEstimators = None     #estimators of regressor before it was grown by incremental training
+
         if rFactor == None and nRaises != 1:
             raise Exception('Must set \'rFactor\' when \'nRaises\ is not 1.')
         if rFactor <= 0 or rFactor >= 1: raise Exception('rFActor must be between 0 and 1, exclusive.')
@@ -67,26 +76,114 @@ class Player:
         Valid action_strings are fold, check, call, raise, and bet.
         """
 
-        gameFeatures = self._genGameFeatures(gameState)
-        allActions = self._allActions(gameState)  
+        actions, features = self.decide([gameState], [self._cards], [self._stack])
 
-        #if player has not yet been trained
-        if not self._fit: action = random.choice(allActions)    #take a random action
+        self.recordDecision(features[0], self._stack)
+        return actions[0]
 
-        else:
-            #determine best action
-            allFeatures = []
-            for a in allActions: allFeatures.append(gameFeatures + self._genActionFeatures(a, gameState))
-            pReturn = self._reg.predict(allFeatures)
-            action = allActions[np.argmax(pReturn)]
+    def decide(self, gameStates, holeCards, stacks):
+
+        """
+        Accepts parallel lists of gameStates, hole cards and stack sizes, one for each decision, e.g. at several 
+        tables, and returns the list of chosen actions and the list of features of each chosen action. All candidate
+        actions of all decisions are evaluated by a single regressor prediction. Nothing is stored.
+        """
+
+        return decideJointly([self] * len(gameStates), gameStates, holeCards, stacks)
+
+    def recordDecision(self, features, stack):
+
+        """
+        This method stores the features of an action chosen by decide() with stack size stack, e.g. by a driver
+        of several tables, to be labelled at the end of the hand. Nothing is stored if player is not training.
+        """
+
+        if self._train: self._experience.add(features, stack)
+
+    def predictReturns(self, gameStates, holeCards, stacks, actions):
+
+        """
+        Accepts parallel lists of gameStates, hole cards, stack sizes and actions, one for each decision, and returns
+        the return of each action predicted by the player's regressor, evaluated by a single prediction. A player
+        with a prediction cache uses suit-canonical features, as decide() does, and caches the return of each action.
+        """
+
+        saved = [(self, getattr(self, '_cards', None), self._stack)]
+
+        features = []
+        keys = []    #cache key of each action, None if no cache
+        for i in range(len(gameStates)):
+            self._cards, self._stack = holeCards[i], stacks[i]
+            if self._cache is None:
+                gameFeatures = self._genGameFeatures(gameStates[i])
+                features.append(gameFeatures + self._genActionFeatures(actions[i], gameStates[i]))
+                keys.append(None)
+            else:
+                key, gameFeatures, actionFeatures = self._canonicalFeatures(gameStates[i], [actions[i]])
+                features.append(gameFeatures + actionFeatures[0])
+                keys.append(key)
+
+        self._cards, self._stack = saved[0][1:]
+        return _predict([self] * len(gameStates), saved, features, [[a] for a in actions], keys)
+
+    def addExperience(self, features, stacks, labels):
+
+        """
+        This method stores features recorded outside of act(), with the stack size at each decision and the
+        label of each, e.g. by an engine that keeps its own stacks. Nothing is stored if player is not training.
+        """
+
+        if not self._train: return
+
+        self._experience.extend(features, stacks, labels)
+        self.endHand()
+
+    def popExperience(self):
+
+        """ This method returns the stored features, stack sizes and labels as a tuple of arrays and forgets them. """
+
+        e = self._experience
+        self._experience = ExperienceMemory(e.getCapacity())
+        return e.getFeatures(), e.getStacks(), e.getLabels()
+
+    def recentExperience(self):
+
+        """
+        This method returns the features, stack sizes and labels stored since the last call or training as a tuple
+        of arrays, e.g. to be streamed to a learner, without forgetting them.
+        """
+
+        experience = self._experience.recent()
+        self._experience.mark()
+        return experience
+
+    def setRegressor(self, reg):
+
+        """ This method replaces the player's regressor by reg, which must have been fit, e.g. by a learner. """
+
+        self._reg = reg
+        self._nEstimators = None
+        self._fit = True
+        self.clearCache()
+
+    def snapshot(self):
+
+        """ This method returns a copy of the player without stored features, e.g. to be sent to another process. """
 
-        #store action features
-        actionFeatures = self._genActionFeatures(action, gameState)  
+        player = copy.copy(self)
+        player._experience = ExperienceMemory(self._experience.getCapacity())
+        if self._cache is not None: player._cache = PredictionCache(self._cache.getSize())
+        return player
 
-        if self._train: 
-            self._stacks.append(self._stack)
-            self._features.append(gameFeatures + actionFeatures)
-        return action      
+    def profile(self, profiler):
+
+        """ This method times the actions, feature generation, predictions and end of hand of the player with profiler. """
+
+        profiler.wrap(self, 'act', 'act')
+        profiler.wrap(self, '_genGameFeatures', 'features')
+        profiler.wrap(self, '_genActionFeatures', 'features')
+        profiler.wrap(self, 'endHand', 'endHand')
+        if self._reg is not None: profiler.wrap(self._reg, 'predict', 'predict')
 
     def removeChips(self, amt):
         if amt > self._stack: raise Exception('Requested chips is greater than stack size.')
@@ -97,31 +194,96 @@ class Player:
         if type(amt) != int: raise Exception('Must add integer number of chips.')
         self._stack += amt
 
-    def endHand(self): 
+    def endHand(self, stack=None): 
 
         """
-        This method discards data older than 'self._memory' and updates 'self._labels' with 
-        the change from stack size at each feature generation.
+        This method labels the features stored during the hand with the change from stack size at each
+        feature generation. Labels are computed from 'stack' instead of the player's stack if given, e.g. the
+        expected stack of a fast-forwarded all-in hand. Data older than 'memory' samples has already been
+        overwritten.
         """
 
-        for i in range(len(self._labels), len(self._features)):
-            self._labels.append(self._stack - self._stacks[i])
-
-        self._features = self._features[-self._memory:]
-        self._stacks = self._stacks[-self._memory:]
-        self._labels = self._labels[-self._memory:]
+        self._experience.label(self._stack if stack is None else stack)
 
-    def train(self):
+    def train(self, incremental=False, nEstimators=10):
 
         """ 
         This method trains the player's regressor using the set of gathered features and labels
-        in ordered to predict the outcome of any given action.
+        in ordered to predict the outcome of any given action. If incremental is True and the regressor has been
+        fit, it is only updated with the samples stored since the last training: by partial_fit for regressors
+        which implement it, e.g. SGDRegressor and MLPRegressor, or by adding nEstimators estimators fit with
+        warm_start for ensembles which support it, e.g. GradientBoostingRegressor. Other regressors are refit.
+        Returns True if the regressor was updated incrementally.
         """
         
-        if not self._train: return
-
-        self._reg.fit(self._features, self._labels)
+        if not self._train: return False
+
+        updated = incremental and self._fit and self._update(nEstimators)
+        if not updated:
+            if self._nEstimators is not None:    #undo growth of ensemble by updates
+                self._reg.set_params(n_estimators=self._nEstimators)
+                self._nEstimators = None
+            self._reg.fit(*self._experience.arrays())
+        self._experience.mark()
         self._fit = True
+        self.clearCache()
+        return updated
+
+    def _update(self, nEstimators):
+
+        """ This method updates the regressor with recent samples and returns False if it cannot be updated. """
+
+        params = self._reg.get_params() if hasattr(self._reg, 'get_params') else {}
+        partial = hasattr(self._reg, 'partial_fit')
+        if not partial and not ('warm_start' in params and 'n_estimators' in params): return False
+
+        features, stacks, labels = self._experience.recent()
+        if len(labels) == 0: return True
+
+        if partial: self._reg.partial_fit(features, labels)
+        else:
+            if self._nEstimators is None: self._nEstimators = params['n_estimators']
+            self._reg.set_params(warm_start=True, n_estimators=params['n_estimators'] + nEstimators)
+            try: self._reg.fit(features, labels)
+            finally: self._reg.set_params(warm_start=params['warm_start'])
+        return True
+
+    def clearCache(self):
+
+        """ 
+        This method forgets cached predictions, e.g. when another Player sharing the regressor has trained it. It is 
+        called by train(). 
+        """
+
+        if self._cache is not None: self._cache.clear()
+
+    def getCacheStats(self):
+
+        """ This method returns the cache hits and misses and the number of cached predictions, or None if no cache. """
+
+        return self._cache.getStats() if self._cache is not None else None
+
+    def _canonicalFeatures(self, gameState, actions):
+
+        """
+        This method generates features from the player's cards and board relabeled by canonicalCards(), so that
+        deals which differ only by suits share features, and so cached predictions. Returns the cache key of the
+        decision, made of its game features and the features of every action, the game features and the list of
+        action features of each of actions (list).
+        """
+
+        cards, board = self._cards, gameState.cards
+        self._cards, gameState.cards = canonicalCards(cards, board)
+        try:
+            gameFeatures = self._genGameFeatures(gameState)
+            key = list(gameFeatures)
+            allActionFeatures = []
+            for a in actions:
+                actionFeatures = self._genActionFeatures(a, gameState)
+                key.extend(actionFeatures)
+                allActionFeatures.append(actionFeatures)
+            return tuple(key), gameFeatures, allActionFeatures
+        finally: self._cards, gameState.cards = cards, board
 
     def _allActions(self, gameState):
         
@@ -173,6 +335,10 @@ class Player:
 
     def show(self): return self._cards
 
+    def isFit(self): return self._fit
+
+    def getRegressor(self): return self._reg
+
     def getStack(self): return self._stack
 
     def getBankroll(self): return self._bankroll
@@ -181,8 +347,115 @@ class Player:
 
     def getRaiseChoices(self): return self._rChoices[:]
 
-    def getFeatures(self): return self._features[:]
+    def getFeatures(self): return self._experience.getFeatures()
+
+    def getLabels(self): return self._experience.getLabels()
+
+    def getMemorySize(self): return len(self._experience)    #number of stored features
+
+    def getCounters(self): 
 
-    def getLabels(self): return self._labels[:]
+        """ This method returns the decisions made, and the predictions made and seconds spent predicting to decide. """
+
+        return {'decisions': self._nDecisions, 'predicts': self._nPredicts, 'predictTime': self._tPredict}
+
+    def setBankroll(self, amt): self._bankroll = amt
+
+def decideJointly(players, gameStates, holeCards, stacks):
+
+    """
+    This function accepts parallel lists of Players, gameStates, hole cards and stack sizes, one for each decision,
+    and returns the list of chosen actions and the list of features of each chosen action, as Player.decide(). The
+    Players must share one regressor and all be fit or all be unfit, so that all candidate actions of all decisions
+    are evaluated by a single prediction. Each Player generates the features of its own decisions. The prediction
+    is counted by every Player taking part in it. Players with a prediction cache generate features from their
+    suit-canonical cards, and only decisions missing from their cache are predicted. Nothing is stored.
+    """
+
+    saved = [(p, getattr(p, '_cards', None), p._stack) for p in set(players)]
+
+    allGameFeatures = []
+    allActions = []
+    allActionFeatures = []    #action features of each action of each decision of a player with a cache, else None
+    keys = []                 #cache key of each decision of a player with a cache, else None
+    for i, p in enumerate(players):
+        p._cards, p._stack = holeCards[i], stacks[i]
+        allActions.append(p._allActions(gameStates[i]))
+        if p._cache is None:
+            allGameFeatures.append(p._genGameFeatures(gameStates[i]))
+            allActionFeatures.append(None)
+            keys.append(None)
+        else:
+            key, gameFeatures, actionFeatures = p._canonicalFeatures(gameStates[i], allActions[i])
+            allGameFeatures.append(gameFeatures)
+            allActionFeatures.append(actionFeatures)
+            keys.append(key)
+
+    #if players have not yet been trained
+    if not players[0]._fit: actions = [random.choice(a) for a in allActions]    #take a random action
+
+    else:
+        #determine best action of each decision
+        allFeatures = []
+        for i, p in enumerate(players):
+            if allActionFeatures[i] is not None:
+                for f in allActionFeatures[i]: allFeatures.append(allGameFeatures[i] + f)
+            else:
+                for a in allActions[i]: allFeatures.append(allGameFeatures[i] + p._genActionFeatures(a, gameStates[i]))
+        pReturn = _predict(players, saved, allFeatures, allActions, keys)
+        actions = []
+        start = 0
+        for a in allActions:
+            actions.append(a[np.argmax(pReturn[start:start + len(a)])])
+            start += len(a)
+
+    for p in players: p._nDecisions += 1
+
+    #features of chosen actions
+    features = []
+    for i, p in enumerate(players):
+        if allActionFeatures[i] is not None: 
+            features.append(allGameFeatures[i] + allActionFeatures[i][allActions[i].index(actions[i])])
+        else: features.append(allGameFeatures[i] + p._genActionFeatures(actions[i], gameStates[i]))
+
+    for p, cards, stack in saved: p._cards, p._stack = cards, stack
+    return actions, features
+
+def _predict(players, saved, allFeatures, allActions, keys):
+
+    """ 
+    This function predicts the return of each row of allFeatures, taking the returns of each decision with a key 
+    from the cache of its player where possible.
+    """
 
-    def setBankroll(self, amt): self._bankroll = amt
\ No newline at end of file
+    if keys.count(None) == len(keys): rows = allFeatures
+    else:
+        pReturn = np.empty(len(allFeatures))
+        missing = []    #decisions whose returns are not cached, with the first row of each
+        rows = []
+        start = 0
+        for i, key in enumerate(keys):
+            n = len(allActions[i])
+            returns = players[i]._cache.get(key) if key is not None else None
+            if returns is not None: pReturn[start:start + n] = returns
+            else:
+                missing.append((i, start))
+                rows.extend(allFeatures[start:start + n])
+            start += n
+        if not rows: return pReturn
+
+    start = time.time()
+    predicted = players[0]._reg.predict(rows)
+    elapsed = time.time() - start
+    for p, cards, stack in saved:
+        p._tPredict += elapsed
+        p._nPredicts += 1
+
+    if rows is allFeatures: return predicted
+    j = 0    #first row of predicted of current decision
+    for i, start in missing:
+        n = len(allActions[i])
+        pReturn[start:start + n] = predicted[j:j + n]
+        if keys[i] is not None: players[i]._cache.put(keys[i], predicted[j:j + n].copy())
+        j += n
+    return pReturn
@@ -0,0 +1,79 @@
+import time
+import numpy as np
+from array import array
+
+class Profiler:
+
+    """
+    This class times calls of methods of objects, e.g. the phases of a hand played by a Table. A method is timed
+    by shadowing it with a timing wrapper on the object itself, so objects which are not being profiled run
+    their methods untouched. Durations of every call are kept, to report totals, counts and percentiles.
+    """
+
+    def __init__(self):
+
+        self._times = {}      #durations in seconds of calls of each phase
+        self._wrapped = []    #(object, method name) of each wrapped method
+
+    def wrap(self, obj, method, phase):
+
+        """ This method times every call of obj.method under the name phase (string). """
+
+        if (obj, method) in self._wrapped: return
+        self._wrapped.append((obj, method))
+        setattr(obj, method, self._timed(getattr(obj, method), self._times.setdefault(phase, array('d'))))
+
+    def wrapPhases(self, obj, method, phase):
+
+        """
+        This method times every call of obj.method under the name returned by phase (callable), which accepts
+        the arguments of each call.
+        """
+
+        if (obj, method) in self._wrapped: return
+        self._wrapped.append((obj, method))
+        f, times = getattr(obj, method), self._times
+
+        def timed(*args):
+            durations = times.setdefault(phase(*args), array('d'))
+            start = time.time()
+            try: return f(*args)
+            finally: durations.append(time.time() - start)
+
+        setattr(obj, method, timed)
+
+    def unwrap(self):
+
+        """ This method restores every wrapped method. Recorded times are kept. """
+
+        for obj, method in self._wrapped: delattr(obj, method)
+        del self._wrapped[:]
+
+    def reset(self):
+        for durations in self._times.values(): del durations[:]
+
+    def stats(self):
+
+        """
+        This method returns a dictionary holding, for each phase, a dictionary of the number of calls, the total
+        and mean time and the 50th, 90th and 99th percentile of the time of a call, in seconds.
+        """
+
+        stats = {}
+        for phase, durations in self._times.items():
+            if not durations: continue
+            d = np.array(durations)
+            p50, p90, p99 = np.percentile(d, [50, 90, 99])
+            stats[phase] = {'calls': len(d), 'total': float(d.sum()), 'mean': float(d.mean()),
+                            'p50': float(p50), 'p90': float(p90), 'p99': float(p99)}
+        return stats
+
+    @staticmethod
+    def _timed(f, durations):
+
+        def timed(*args, **kwargs):
+            start = time.time()
+            try: return f(*args, **kwargs)
+            finally: durations.append(time.time() - start)
+
+        return timed
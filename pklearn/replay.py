@@ -0,0 +1,178 @@
+import numpy as np
+from collections import deque
+from player import Player
+from table import Table
+from handlog import readHandLog, unpackActions, CHECK, FOLD, CALL, RAISE, ACTION_CODES
+
+_ACTIONS = {CHECK: ('check',), FOLD: ('fold',), CALL: ('call',)}    #action of each code but RAISE
+
+def decks(records):
+
+    """
+    This function returns the deck of each hand record of a HandLog as an array of 52 deck indices in dealing
+    order: the recorded cards as dealt, followed by the undealt cards in deck order.
+    """
+
+    cards = records['cards'].astype(np.int64)
+    key = np.tile(np.arange(52, 104), (len(cards), 1))    #undealt cards sort after dealt cards, in deck order
+    rows, cols = np.nonzero(cards >= 0)
+    key[rows, cards[rows, cols]] = cols
+    return np.argsort(key, axis=1).astype(np.int8)
+
+class ReplayDealer:
+
+    """
+    This class deals recorded decks in order, in place of a Dealer, so that a Table with new Players is dealt
+    the same cards as a recorded run.
+    """
+
+    def __init__(self, recorded):
+
+        """ Constructor accepts hand records of a HandLog or an array of decks with one deck of 52 indices per row. """
+
+        self._decks = decks(recorded) if recorded.dtype.names else np.asarray(recorded, dtype=np.int8)
+        self._next = 0    #row of next deck in self._decks
+
+    def nextDeck(self):
+
+        """ This method returns the next recorded deck as an array of 52 card indices. """
+
+        if self._next == len(self._decks): raise Exception('Recorded decks are exhausted.')
+        deck = self._decks[self._next]
+        self._next += 1
+        return deck
+
+    def generator(self, stream): return np.random.RandomState()
+
+    def getSeed(self): return None
+
+    def __len__(self): return len(self._decks) - self._next    #number of decks left
+
+def replay(records, players, vocal=False):
+
+    """
+    This function replays each recorded hand of a HandLog with players (list) seated in recorded positions. Each
+    hand is played with the recorded blinds, dealer, cards and starting stacks, which players buy from their
+    bankrolls. Returns the chips won or lost by each position in each hand (array of shape hands x seats).
+    """
+
+    if type(records) == str: records = readHandLog(records)
+
+    tables = {}
+    net = np.zeros(records['stacks'].shape, dtype=np.int64)
+    for h, (r, deck) in enumerate(zip(records, decks(records))):
+        numP = int(r['numP'])
+        stacks = r['stacks'][:numP].tolist()
+        table = _table(tables, r)
+        for p, stack in zip(players, stacks):
+            p.cashOut()
+            if not p.buyChips(stack): raise Exception(p.getName() + ' cannot buy recorded stack.')
+        table.replayHand(players[:numP], deck, int(r['dealer']), vocal)
+        net[h, :numP] = [p.getStack() - stack for p, stack in zip(players, stacks)]
+    return net
+
+def rescore(records, player, batchSize=4096):
+
+    """
+    This function re-scores the recorded decisions of a HandLog with player, without playing the hands again.
+    The GameState of every recorded decision is rebuilt by replaying the recorded actions, and player chooses
+    an action and predicts the return of the recorded action for batches of decisions at a time.
+
+    Returns a dictionary of arrays with one entry per decision:
+    hand - index of hand record
+    position - position of actor
+    action, amount - recorded action code and round bet of actor after action
+    label - recorded return of action, the change in the actor's stack from the decision to the end of the hand
+    predicted - return of recorded action predicted by player (nan if player is not fit)
+    choice, choiceAmount - code and raise to amount (0 if not a raise) of action chosen by player
+    agree - True where player chose the recorded action
+
+    Hands with more actions than the HandLog records are skipped.
+    """
+
+    if type(records) == str: records = readHandLog(records)
+
+    fields = ('hand', 'position', 'action', 'amount', 'label', 'predicted', 'choice', 'choiceAmount')
+    result = dict((f, []) for f in fields)
+    points = []    #(hand, gameState, hole cards, stack, code, amount, label) of each decision not yet scored
+
+    tables = {}
+    script = deque()
+    scripted = [_Scripted(script, points) for i in range(records['stacks'].shape[1])]
+    for h, (r, deck) in enumerate(zip(records, decks(records))):
+        numP, nActions = int(r['numP']), int(r['nActions'])
+        if nActions > len(r['actions']): continue
+
+        actors, codes = unpackActions(r['actions'][:nActions])
+        script.extend(zip(actors.tolist(), codes.tolist(), r['amounts'][:nActions].tolist()))
+        stacks = r['stacks'][:numP].tolist()
+        for p, stack in zip(scripted, stacks): p.setStack(stack)
+        start = len(points)
+        _table(tables, r).replayHand(scripted[:numP], deck, int(r['dealer']))
+        if script: raise Exception('Recorded actions of hand ' + str(h) + ' were not all replayed.')
+
+        for i in range(start, len(points)):
+            gameState, cards, stack, code, amount = points[i]
+            points[i] = (h, gameState, cards, stack, code, amount, scripted[gameState.actor].getStack() - stack)
+        if len(points) >= batchSize: _score(points, player, result)
+
+    _score(points, player, result)
+
+    result = dict((f, np.array(result[f], dtype=float if f in ('label', 'predicted') else np.int64)) for f in fields)
+    result['agree'] = (result['choice'] == result['action']) & \
+                      ((result['choice'] != RAISE) | (result['choiceAmount'] == result['amount']))
+    return result
+
+def _score(points, player, result):
+
+    """ This function scores decision points with player, appends them to result and empties points. """
+
+    if not points: return
+
+    hands, gameStates, cards, stacks, codes, amounts, labels = zip(*points)
+    recorded = [_ACTIONS[c] if c != RAISE else ('raise', a) for c, a in zip(codes, amounts)]
+    actions = player.decide(gameStates, cards, stacks)[0]
+    if player.isFit(): predicted = player.predictReturns(gameStates, cards, stacks, recorded)
+    else: predicted = [np.nan] * len(points)
+
+    result['hand'].extend(hands)
+    result['position'].extend([s.actor for s in gameStates])
+    result['action'].extend(codes)
+    result['amount'].extend(amounts)
+    result['label'].extend(labels)
+    result['predicted'].extend(predicted)
+    result['choice'].extend([ACTION_CODES[a[0]] for a in actions])
+    result['choiceAmount'].extend([a[1] if len(a) > 1 else 0 for a in actions])
+    del points[:]
+
+def _table(tables, record):
+
+    """ This function returns the Table of tables with the blinds of record, creating it if necessary. """
+
+    blinds = (int(record['smallBlind']), int(record['bigBlind']))
+    #maximum buy in only limits seating, which replayed hands bypass
+    if blinds not in tables: tables[blinds] = Table(blinds[0], blinds[1], int(record['stacks'].max()))
+    return tables[blinds]
+
+class _Scripted(Player):
+
+    """ This class plays the recorded actions of a hand and records the GameState of each decision. """
+
+    def __init__(self, script, points):
+
+        Player.__init__(self, name='Replay', bankroll=0, nRaises=1, memory=0, rFactor=.5)
+        self.stopTraining()
+        self._script = script    #(actor, code, amount) of each recorded action not yet played, shared by positions
+        self._points = points
+
+    def setStack(self, stack):
+        self.cashOut()
+        self.setBankroll(stack)
+        self.buyChips(stack)
+
+    def act(self, gameState):
+
+        actor, code, amount = self._script.popleft()
+        if actor != gameState.actor: raise Exception('Recorded action does not match replayed hand.')
+        self._points.append((gameState.copy(), self._cards, self._stack, code, amount))
+        return _ACTIONS[code] if code != RAISE else ('raise', amount)
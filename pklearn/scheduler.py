@@ -0,0 +1,122 @@
+import cPickle
+import numpy as np
+from collections import deque
+from multiprocessing import Pool
+from workers import seatSnapshot, buyInChunks, buyIn, netWinnings, bbPer100
+
+class Scheduler:
+
+    """
+    This class plays a pool of Players at several tables at once. Before each round, tables are filled from a
+    waiting list so that the Players who have waited longest are seated first, and each table's seating order
+    is shuffled so that positions rotate. Tables play their hands concurrently in a pool of processes, each with
+    a snapshot of its Players, and the experience and winnings of every Player are collected back into the pool
+    after each round, where Players are trained.
+    """
+
+    def __init__(self, players, tableFactory, nTables, seatsPerTable, workers=1, seed=None):
+
+        """
+        Constructor accepts the pool of Players (list), a picklable callable such that tableFactory(dealer=dealer)
+        returns an empty Table, the number of tables (int) and Players per table (int), the number of processes
+        (int) and a seed (int), for which results are deterministic whatever the number of processes.
+        """
+
+        if seatsPerTable < 2: raise Exception('Tables must seat at least 2 players.')
+        if len(players) < seatsPerTable: raise Exception('Pool has fewer players than a table has seats.')
+
+        self._players = list(players)
+        self._tableFactory = tableFactory
+        self._nTables = min(nTables, len(players) / seatsPerTable)    #tables which can be filled
+        self._seats = seatsPerTable
+        self._workers = workers
+        self._rng = np.random.RandomState(seed)
+        self._waiting = deque(range(len(players)))    #indices of players, longest waiting first
+        self._hands = np.zeros(len(players), dtype=np.int64)    #hands played by each player
+        self._net = np.zeros(len(players), dtype=np.int64)      #chips won by each player
+        self._bigBlind = None
+
+    def run(self, nRounds, handsPerRound, nBuyIn=10, train=True):
+
+        """
+        This method plays nRounds rounds of handsPerRound hands at every table, cashing out/buying in Players
+        every nBuyIn hands, or only at the start of each round if nBuyIn is 0. Players who played are trained
+        after every round if train is True. Returns getStats().
+        """
+
+        pool = Pool(self._workers) if self._workers > 1 else None
+        try:
+            for r in range(nRounds):
+                seated = self._round(pool, handsPerRound, nBuyIn)
+                if train:
+                    for i in seated: self._players[i].train()
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        return self.getStats()
+
+    def _round(self, pool, nHands, nBuyIn):
+
+        """ 
+        This method seats Players from the waiting list, plays a round at every table and collects results.
+        Returns the indices of seated Players.
+        """
+
+        tables = []
+        for t in range(self._nTables):
+            seated = [self._waiting.popleft() for i in range(self._seats)]
+            self._rng.shuffle(seated)
+            tables.append(seated)
+        for seated in tables: self._waiting.extend(seated)
+
+        tasks = []
+        for seated in tables:
+            for i in seated: self._players[i].cashOut()
+            snapshot = cPickle.dumps([self._players[i].snapshot() for i in seated], cPickle.HIGHEST_PROTOCOL)
+            tasks.append((self._tableFactory, snapshot, nHands, nBuyIn, self._rng.randint(2**31 - 1)))
+
+        results = pool.map(_playTable, tasks) if pool is not None else [_playTable(t) for t in tasks]
+
+        for seated, (hands, net, experience, bigBlind) in zip(tables, results):
+            self._bigBlind = bigBlind
+            for j, i in enumerate(seated):
+                p = self._players[i]
+                p.setBankroll(p.getBankroll() + net[j])
+                p.addExperience(*experience[j])
+                self._hands[i] += hands
+                self._net[i] += net[j]
+
+        return [i for seated in tables for i in seated]
+
+    def getStats(self):
+
+        """
+        This method returns a list of dictionaries holding the hands played, net chips won and win rate in big
+        blinds per 100 hands of each Player since the Scheduler was created.
+        """
+
+        stats = []
+        for i, p in enumerate(self._players):
+            stats.append({'name': p.getName(), 'hands': int(self._hands[i]), 'net': int(self._net[i]),
+                          'bbPer100': bbPer100(self._net[i], self._bigBlind, self._hands[i])})
+        return stats
+
+    def getPlayers(self): return self._players[:]
+
+    def getWaiting(self): return [self._players[i] for i in self._waiting]
+
+def _playTable(args):
+
+    """ This function plays a round at one table in a worker process. """
+
+    tableFactory, snapshot, nHands, nBuyIn, seed = args
+    table, players, start = seatSnapshot(tableFactory, snapshot, seed)
+
+    played = 0
+    for n in buyInChunks(nHands, nBuyIn):
+        buyIn(players, table.getParams()[2])
+        played += table.playHands(n)
+
+    return played, netWinnings(players, start), [p.popExperience() for p in players], table.getParams()[1]
@@ -0,0 +1,117 @@
+import numpy as np
+
+def settle(bets, ranks, dealer):
+
+    """
+    This function divides the pot between the players of a hand in a single pass over its side pots.
+
+    Parameters:
+    bets - total contribution of each position to the pot (list of int)
+    ranks - rank of the hand of each position, lower is better, None for folded positions (list)
+    dealer - position of dealer, odd chips of a split pot go to the first winner after dealer (int)
+
+    Each pot of pots() is split between the best ranked players who have contributed to all of it. Returns the
+    award of each winner of each pot in order of pot and position, as tuples (position, chips, pot, odd), where
+    pot counts from 0 for the main pot and odd is True for the odd chips of a split pot.
+    """
+
+    numP = len(bets)
+    byRank = sorted([i for i in range(numP) if ranks[i] is not None and bets[i] > 0], key=lambda i: ranks[i])
+
+    awards = []
+    best = 0    #index in byRank of first player who may win the current pot
+    for pot, (top, chips) in enumerate(pots(bets, [r is not None for r in ranks])):
+
+        #best ranked players who contributed at least top
+        while bets[byRank[best]] < top: best += 1
+        minRank = ranks[byRank[best]]
+        winners = []
+        for j in byRank[best:]:
+            if ranks[j] != minRank: break
+            if bets[j] >= top: winners.append(j)
+        winners.sort()
+
+        winnings = chips // len(winners)
+        for w in winners: awards.append((w, winnings, pot, False))
+        if chips > winnings * len(winners):
+            first = min(winners, key=lambda w: (w - dealer - 1) % numP)
+            awards.append((first, chips - winnings * len(winners), pot, True))
+
+    return awards
+
+def pots(bets, live):
+
+    """
+    This function accepts the total contribution of each position to the pot (list of int) and whether each
+    position has not folded (list of bool), and returns the main pot and side pots as tuples (top, chips). A pot
+    is formed at each distinct contribution top of a player who has not folded, from the contributions of every
+    position above the previous pot's top, up to top. Contributions are sorted once and pots are built in a
+    single pass.
+    """
+
+    numP = len(bets)
+    order = sorted(range(numP), key=lambda i: bets[i])    #positions by contribution
+
+    result = []
+    level = 0     #top of previous pot
+    paid = 0      #chips in previous pots
+    prefix = 0    #sum of contributions of positions before k in order, each at most bets[order[k]]
+    for k in range(numP):
+        i = order[k]
+        if live[i] and bets[i] > level:
+            top = bets[i]
+            chips = prefix + top * (numP - k) - paid    #every contribution is capped at top
+            result.append((top, chips))
+            level = top
+            paid += chips
+        prefix += bets[i]
+
+    if paid != sum(bets): raise Exception('Folded players contributed more than any player who has not folded.')
+    return result
+
+def expectedSettle(bets, live, ranks, dealer):
+
+    """
+    This function returns the expected chips won by each position, averaged over several runouts of the board
+    with the same rules as settle().
+
+    Parameters:
+    bets - total contribution of each position to the pot (list of int)
+    live - positions which have not folded (list of int)
+    ranks - hand ranks with one row per runout and one column per position of live (array)
+    dealer - position of dealer (int)
+    """
+
+    numP = len(bets)
+    ranks = np.asarray(ranks)
+    isLive = [False] * numP
+    for i in live: isLive[i] = True
+
+    expected = np.zeros(numP)
+    for top, chips in pots(bets, isLive):
+
+        #columns of players eligible for pot, in order after dealer so that the first winner gets odd chips
+        cols = [c for c in range(len(live)) if bets[live[c]] >= top]
+        cols.sort(key=lambda c: (live[c] - dealer - 1) % numP)
+
+        eligible = ranks[:, cols]
+        best = eligible == eligible.min(axis=1)[:, None]
+        nWinners = best.sum(axis=1)
+        winnings = chips // nWinners
+        won = best * winnings[:, None]
+        won[np.arange(len(won)), best.argmax(axis=1)] += chips - winnings * nWinners
+        expected[[live[c] for c in cols]] += won.mean(axis=0)
+
+    return expected
+
+def roundAwards(expected, total):
+
+    """
+    This function rounds expected chips (array) to integers which sum to total, giving the chips lost to
+    rounding down to the largest fractions.
+    """
+
+    chips = np.floor(expected).astype(np.int64)
+    short = int(total - chips.sum())
+    if short > 0: chips[np.argsort(chips - expected, kind='mergesort')[:short]] += 1
+    return chips.tolist()
@@ -1,8 +1,12 @@
 from player import Player
-from random import shuffle
 from card import Card
+from dealer import Dealer
 from deuces.deuces import Evaluator
 from gamestate import GameState
+from events import Narrator
+from settlement import settle, expectedSettle, roundAwards
+from profiler import Profiler
+from equity import runouts, runoutRanks
 
 class Table:    
 
@@ -12,15 +16,36 @@ class Table:
     with integer number of chips with uniform value.
     """
 
-    def __init__(self, smallBlind, bigBlind, maxBuyIn):
+    def __init__(self, smallBlind, bigBlind, maxBuyIn, dealer=None, fastForward=None, maxRunouts=1000):
 
-        """ Constructor accepts  blinds and maximum table buy in as integers. """
+        """ 
+        Constructor accepts  blinds and maximum table buy in as integers. Decks are taken from 'dealer' (Dealer),
+        a Dealer with a random seed is used if none is given.
+
+        Once every player left in a hand but at most one is all-in, the hand is fast-forwarded if 'fastForward'
+        is set: the expected chips won by each player are computed over every runout of the board, or over
+        'maxRunouts' random runouts if there are more. If 'fastForward' is 'labels', players' labels are
+        computed from their expected stacks while the hand is played out as usual. If it is 'stacks', the board
+        is not dealt and stacks are also credited with the expected chips, rounded.
+        """
         
         self._players = []  #players at the table
         self._playing = []  #players who are not bankrupt
         self._sitOut = []   #players who have gone bankrupt
         self._dealer = 0    #position of dealer in self._playing
-        self._eval = Evaluator()
+        self._eval = Evaluator(direct=True)
+        self._cardDealer = dealer if dealer is not None else Dealer()
+        self._cards = Card.DECK    #card of each deck index
+        self._s = GameState([])    #reset at the beginning of each hand
+        self._listeners = []    #TableListeners which receive the events of each hand
+
+        if fastForward not in (None, 'labels', 'stacks'): raise Exception('fastForward must be \'labels\' or \'stacks\'.')
+        self._fastForward = fastForward
+        self._maxRunouts = maxRunouts
+        self._rng = self._cardDealer.generator(1)    #samples runouts when fast-forwarding
+        self._expected = None    #expected chips won by each position of a fast-forwarded hand
+        self._profiler = None    #times phases of hands while profiling
+        self._profiling = False
 
         if type(smallBlind) != int or type(bigBlind) != int or type(maxBuyIn) != int:
             raise Exception('Parameters must be integer number of chips.')
@@ -32,6 +57,56 @@ class Table:
 
         self._sitOut.append(player)
         self._players.append(player)
+        if self._profiling: player.profile(self._profiler)
+
+    def addListener(self, listener):
+
+        """ This method adds a TableListener, e.g. a HandLog, which receives the events of every hand. """
+
+        self._listeners.append(listener)
+
+    def removeListener(self, listener): self._listeners.remove(listener)
+
+    def enableProfiling(self):
+
+        """
+        This method starts timing each phase of every hand: generating the deck, dealing, preflop betting, the
+        betting of each street which is played, all-in equity, paying winners and the whole hand, and each Player's
+        actions, feature generation, regressor predictions and end of hand. Phases are timed by wrapping methods of the table, its players and their
+        regressors, so nothing is timed while profiling is disabled. Times of nested phases overlap, e.g. the
+        time of each action is included in the time of its street. Disable profiling before pickling players.
+        """
+
+        if self._profiler is None: self._profiler = Profiler()
+        self._profiling = True
+
+        self._profiler.wrap(self, '_playHand', 'hand')
+        self._profiler.wrap(self, '_generateDeck', 'deck')
+        self._profiler.wrap(self, '_dealHoleCards', 'deal')
+        self._profiler.wrap(self, '_preFlop', 'preflop')
+        self._profiler.wrapPhases(self, '_playStreet', lambda street: street)
+        self._profiler.wrap(self, '_allInEquity', 'equity')
+        self._profiler.wrap(self, '_payWinners', 'payWinners')
+        for p in self._players: p.profile(self._profiler)
+
+    def disableProfiling(self):
+
+        """ This method stops timing phases of hands. Times recorded so far are kept. """
+
+        if self._profiler is not None: self._profiler.unwrap()
+        self._profiling = False
+
+    def stats(self):
+
+        """
+        This method returns the calls, total and mean time and 50th, 90th and 99th percentile time in seconds of
+        each phase timed since profiling was first enabled, as a dictionary of dictionaries by phase.
+        """
+
+        return self._profiler.stats() if self._profiler is not None else {}
+
+    def resetStats(self):
+        if self._profiler is not None: self._profiler.reset()
 
     def playHand(self, vocal=False):
 
@@ -40,9 +115,54 @@ class Table:
         Returns False if unable to play hand. 
         """
 
-        self._vocal = vocal
+        return self.playHands(1, vocal) == 1
+
+    def playHands(self, n, vocal=False):
+
+        """
+        This method simulates up to n hands between added players, stopping early if unable to play a hand.
+        Narrates hands if vocal is True. Returns number of hands played. Players who are sitting out are only
+        seated at the start of each call, since they cannot buy chips between hands of one call.
+        """
+
+        self._seatPlayers()
+        if vocal: self.addListener(Narrator())
+        try: return self._playHands(n)
+        finally: 
+            if vocal: self._listeners.pop()
+
+    def decisionPoints(self, n):
+
+        """
+        This generator plays up to n hands between added players as playHands(), but instead of requesting each
+        action from its Player, yields the tuple (player, gameState) at each decision point and resumes with the
+        action sent back, e.g. by playTables() of module batch, which plays many tables at once. The gameState is
+        the table's own and is only valid until the table is resumed. Streets and whole hands are not profiled.
+        """
+
+        self._seatPlayers()
+        for hand in range(n):
+
+            if len(self._playing) <= 1: return
+
+            self._generateDeck()
+            self._startHand()
+            self._postBlinds()
+            for numCards in (0, 3, 1, 1):
+                if numCards and not self._flipCards(numCards): continue
+                betting = self._openBetting()
+                action = None
+                while True:
+                    try: decision = betting.send(action)
+                    except StopIteration: break
+                    action = yield decision
+            self._finishHand()
+            self._moveDealer()
+
+    def _seatPlayers(self):
+
+        """ This method adds players to hand who are eligible to play. """
 
-        #add players to hand who are eligible to play
         for p in self._sitOut[:]:
             if p.getStack() >= self._bigBlind:
                 if p.getStack() > self._maxBuyIn: 
@@ -50,62 +170,111 @@ class Table:
                 self._playing.append(p)
                 self._sitOut.remove(p)
 
-        if len(self._playing) <= 1: return False
+    def _playHands(self, n):
+
+        for hand in range(n):
+
+            if len(self._playing) <= 1: return hand
             
-        #reset table game state before hand
-        self._s = GameState(self._playing)
-    
-        #commence simulation
-        self._generateDeck()
-        self._dealHoleCards()
-        self._preFlop()
-        self._flip(3)
-        self._flip(1)
-        self._flip(1)
-        self._payWinners()
-        for p in self._playing: p.endHand()
+            self._generateDeck()
+            self._playHand()
+            self._moveDealer()
+
+        return n
+
+    def _moveDealer(self):
+
+        """ This method moves the dealer chip and removes players who have gone bankrupt after a hand. """
 
         #find next dealer
-        dealerPos = (self._dealer + 1) % self._s.numP
+        numP = self._s.numP
+        dealerPos = (self._dealer + 1) % numP
         while self._playing[dealerPos].getStack() < self._bigBlind: 
-            dealerPos = (dealerPos + 1) % self._s.numP
-        dealer = self._playing[dealerPos]
+            dealerPos = (dealerPos + 1) % numP
 
-        #remove players who have gone bankrupt
-        for p in self._playing[:]:
-            if p.getStack() < self._bigBlind:
-                self._playing.remove(p)
-                self._sitOut.append(p)
+        #remove players who have gone bankrupt and move dealer chip
+        bankrupt = [p.getStack() < self._bigBlind for p in self._playing]
+        if True in bankrupt:
+            self._dealer = dealerPos - sum(bankrupt[:dealerPos])
+            self._sitOut.extend([p for p, b in zip(self._playing, bankrupt) if b])
+            self._playing = [p for p, b in zip(self._playing, bankrupt) if not b]
+        else: self._dealer = dealerPos
 
-        #move dealer chip 
-        self._dealer = 0
-        while self._playing[self._dealer] != dealer: self._dealer = (self._dealer + 1) % self._s.numP
+    def replayHand(self, players, deck, dealer, vocal=False):
 
-        if vocal: print
-        return True
+        """
+        This method plays one hand between players (list) in order of position, with the dealer at position dealer
+        and cards dealt from deck (deck indices in dealing order), e.g. as recorded by a HandLog. Players keep the
+        stacks they have, and the players and dealer of the table are unaffected.
+        """
+
+        playing, dealerPos = self._playing, self._dealer
+        self._playing, self._dealer = list(players), dealer
+        self._deck, self._top = list(deck), 0
+        if vocal: self.addListener(Narrator())
+        try: self._playHand()
+        finally: 
+            self._playing, self._dealer = playing, dealerPos
+            if vocal: self._listeners.pop()
+
+    def _playHand(self):
+
+        """ This method plays a hand between self._playing from the current deck. """
+
+        self._startHand()
+        self._preFlop()
+        for numCards, street in ((3, 'flop'), (1, 'turn'), (1, 'river')):
+            if self._flipCards(numCards): self._playStreet(street)
+        self._finishHand()
+
+    def _startHand(self):
+
+        #reset table game state before hand
+        self._s.reset(self._playing)
+        self._expected = None
+
+        #commence simulation
+        if self._listeners:
+            for l in self._listeners: 
+                l.startHand(self._playing[:], self._dealer, self._deck, self._smallBlind, self._bigBlind)
+        self._dealHoleCards()
+
+    def _finishHand(self):
+
+        if self._expected is not None: stacks = [p.getStack() for p in self._playing]
+        self._payWinners()
+        if self._expected is None: 
+            for p in self._playing: p.endHand()
+        else:
+            for p, stack, expected in zip(self._playing, stacks, self._expected): p.endHand(stack + expected)
+        if self._listeners:
+            for l in self._listeners: l.endHand(self._playing[:])
 
     def _generateDeck(self):
 
-        self._deck = []
-        for s in ['c', 'd', 'h', 's']:
-            for i in range(2,15):
-                self._deck.append(Card(i,s))
-        shuffle(self._deck)
+        self._deck = self._cardDealer.nextDeck().tolist()    #card indices in dealing order
+        self._top = 0    #position of next card in self._deck
  
     def _dealHoleCards(self):
 
         """ This method gives each player their starting cards at the beginning of the hand. """
 
         for p in self._playing:
-            p.takeHoleCards((self._deck[0],self._deck[1]))
-            if self._vocal: print p.getName() + '(' + str(p.getStack()) + ')', 'dealt', self._deck[0], 'and', self._deck[1]
-            self._deck = self._deck[2:]
-        if self._vocal: print
+            hole = (self._cards[self._deck[self._top]], self._cards[self._deck[self._top + 1]])
+            p.takeHoleCards(hole)
+            self._top += 2
+        if self._listeners:
+            for l in self._listeners: l.deal(self._playing[:])
 
     def _preFlop(self):
 
         """ This method posts the blinds and commences betting. """
 
+        self._postBlinds()
+        self._bet()
+
+    def _postBlinds(self):
+
         self._s.minRaise = 2 * self._bigBlind    #minimum first raise before flop is 2 x Big Blind
 
         sbPos = (self._dealer + 1) % self._s.numP    #small blind position
@@ -121,98 +290,103 @@ class Table:
         #post blinds
         self._s.currBets[sbPos] += self._smallBlind
         self._playing[sbPos].removeChips(self._smallBlind)
-        if self._vocal: print self._playing[sbPos].getName(), 'posts small blind of', self._smallBlind
+        if self._listeners:
+            for l in self._listeners: l.blind(sbPos, self._playing[sbPos], self._smallBlind, False)
         self._s.currBets[bbPos] += self._bigBlind
         self._playing[bbPos].removeChips(self._bigBlind)
-        if self._vocal: print self._playing[bbPos].getName(), 'posts big blind of', self._bigBlind
+        if self._listeners:
+            for l in self._listeners: l.blind(bbPos, self._playing[bbPos], self._bigBlind, True)
+        self._s.maxBet = max(self._s.currBets)
+
+    def _playStreet(self, street):  
+
+        """ This method plays the round of betting of street ('flop', 'turn' or 'river') once its cards are flipped. """
 
-        self._openBetting()
-        if self._vocal: print
+        self._bet()
 
-    def _flip(self, numCards):  
+    def _flipCards(self, numCards):
 
-        """ This method flips numCards cards from deck to be seen by players and then commences betting. """
+        """ This method flips numCards cards from deck and returns whether a round of betting follows. """
 
-        if len(self._s.folded) + 1 == self._s.numP: return    #all players but one have folded
+        if len(self._s.folded) + 1 == self._s.numP: return False    #all players but one have folded
+
+        #no further betting is possible
+        if self._fastForward is not None and self._s.nActive <= 1:
+            if self._expected is None: self._allInEquity()
+            if self._fastForward == 'stacks': return False
 
         self._s.minRaise = self._bigBlind    #minimum first bet after the flop is Big Blind
 
         #flip numCards
-        self._s.cards += self._deck[:numCards]
-        if self._vocal: print [str(c) for c in self._s.cards]
-        self._deck = self._deck[numCards:]
+        self._s.cards += [self._cards[i] for i in self._deck[self._top:self._top + numCards]]
+        if self._listeners:
+            for l in self._listeners: l.board(self._s.cards[:])
+        self._top += numCards
         
         self._s.actor = (self._dealer + 1) % self._s.numP    #first actor is player after dealer
-        
-        self._openBetting()
-        if self._vocal: print
+        return True
 
     def _payWinners(self):
 
         """ This method distributes the pot to the winner(s). """
 
+        live = [i for i in range(self._s.numP) if i not in self._s.folded]
+
+        #fast-forwarded hand, pay expected chips
+        if self._expected is not None and self._fastForward == 'stacks':
+            chips = roundAwards(self._expected, sum(self._s.bets))
+            awards = [(i, chips[i], 0, 'equity') for i in live]
+
+        else:
+            #evaluate rank of hand for each player who has not folded
+            board = [card.toInt() for card in self._s.cards]
+            ranks = [None] * self._s.numP
+            if not board:    #all players but one have folded before flop
+                for i in live: ranks[i] = -1
+            else:
+                hands = [(self._playing[i].show()[0].toInt(), self._playing[i].show()[1].toInt()) for i in live]
+                for i, rank in zip(live, self._eval.evaluate_showdown(board, hands)): ranks[i] = rank
+
+            #rank is -1 if everyone else folded
+            awards = [(i, chips, pot, 'odd' if odd else 'uncontested' if ranks[i] == -1 else 'pot') 
+                      for i, chips, pot, odd in settle(self._s.bets, ranks, self._dealer)]
+
+        #pay winners of each pot
+        for i, chips, pot, kind in awards:
+            player = self._playing[i]
+            player.addChips(chips)
+            if self._listeners:
+                for l in self._listeners: l.award(i, player, chips, pot, kind)
+        for i in range(self._s.numP): self._s.bets[i] = 0
+
+    def _allInEquity(self):
+
+        """ This method computes the expected chips won by each player over the runouts of the board. """
+
+        live = [i for i in range(self._s.numP) if i not in self._s.folded]
+        hands = [(self._playing[i].show()[0].toInt(), self._playing[i].show()[1].toInt()) for i in live]
         board = [card.toInt() for card in self._s.cards]
-        
-        #evaluate rank of hand for each player
-        ranks = {}
-        for p in self._playing:
-            if not board: rank = -1    #all players but one have folded before flop
-            else: rank = self._eval.evaluate(board, [p.show()[0].toInt(), p.show()[1].toInt()])
-            ranks[p] = rank
-
-        n = 0
-        while sum(self._s.bets) > 0:    #to handle n side pots
-
-            #get rank of best hand and bet of each player who is eligible to win sub pot
-            minLiveBet = None    #bet that any eligible player has in current sub pot
-            minRank = None
-            eligibleWinners = []
-            for i in range(self._s.numP):
-                if not i in self._s.folded and self._s.bets[i] != 0:    #if player hasnt folded and has stake in current sub pot
-                    if minLiveBet == None: minLiveBet = self._s.bets[i]
-                    else: minLiveBet = min(minLiveBet, self._s.bets[i])
-                    player = self._playing[i]
-                    eligibleWinners.append(player)
-                    if minRank == None: minRank = ranks[player]
-                    else: minRank = min(minRank, ranks[player])
-
-            #create sub pot by adding contributions of its members
-            winners = [p for p in eligibleWinners if ranks[p] == minRank]
-            subPot = 0
-            for i in range(self._s.numP):
-                contribution = min(minLiveBet, self._s.bets[i])
-                self._s.bets[i] -= contribution
-                subPot += contribution
-
-
-            #pay winners
-            winnings = int(float(subPot) / len(winners))
-            for w in winners:
-                w.addChips(winnings)
-                subPot -= winnings
-                if self._vocal:
-                    if minRank == -1:    #everyone else folded
-                        print w.getName(), 'wins', winnings
-                    else:   
-                        if n == 0: print w.getName(), 'wins', winnings, 'from main pot'
-                        if n > 0: print w.getName(), 'wins', winnings, 'from side pot'
-
-            #give odd chips to player in earliest position
-            if subPot > 0:
-                actor = (self._dealer + 1) % self._s.numP
-                while subPot > 0:
-                    player = self._playing[actor]
-                    if player in winners:
-                        player.addChips(subPot)
-                        if self._vocal: print player.getName(), 'wins', subPot, 'odd chips'
-                        subPot = 0
-                    actor = (actor + 1) % self._s.numP
-
-            n += 1
+        deck = [self._cards[i].toInt() for i in self._deck[self._top:]]    #cards which have not been dealt
+
+        ranks = runoutRanks(hands, board, runouts(deck, 5 - len(board), self._maxRunouts, self._rng))
+        self._expected = expectedSettle(self._s.bets, live, ranks, self._dealer)
+
+    def _bet(self):
+
+        """ This method plays a round of betting, requesting each action from its player. """
+
+        betting = self._openBetting()
+        try:
+            player, gameState = next(betting)
+            while True: player, gameState = betting.send(player.act(gameState))
+        except StopIteration: pass
 
     def _openBetting(self): 
 
-        """ The method starts a round of betting. """
+        """
+        This generator plays a round of betting. It yields the acting player and the GameState at each decision
+        and is resumed with the player's action.
+        """
 
         lastRaiser = self._s.actor    #so that action ends when everyone checks
 
@@ -226,38 +400,37 @@ class Table:
             if actor == lastRaiser and t > 1: break    #break if last raising player has been reached
             
             #break if no further calls are possible
-            notAllinOrFold = []
-            for i in range(self._s.numP):
-                if i not in self._s.folded and i not in self._s.allIn: notAllinOrFold.append(i)
-            if len(notAllinOrFold) == 0: break    #break if all players are folded or all-in
+            if self._s.nActive == 0: break    #break if all players are folded or all-in
             #break if last player's raise cannot be matched
-            if len(notAllinOrFold) == 1 and self._s.currBets[notAllinOrFold[0]] == max(self._s.currBets): break    
+            if self._s.nActive == 1:
+                for i in range(self._s.numP):
+                    if i not in self._s.folded and i not in self._s.allIn: break
+                if self._s.currBets[i] == self._s.maxBet: break
 
             #skip player if player folded or player is all in
             if actor in self._s.folded or actor in self._s.allIn: 
                 self._s.actor = (actor + 1) % self._s.numP 
                 continue
 
-            self._s.toCall = max(self._s.currBets) - self._s.currBets[actor]    #player must call maximum bet to call
+            self._s.toCall = self._s.maxBet - self._s.currBets[actor]    #player must call maximum bet to call
 
             #request player action and parse action
-            action = self._playing[actor].act(self._s)
+            action = yield self._playing[actor], self._s
             self._parseAction(action)
             if action[0] == 'raise': lastRaiser = actor
             
             self._s.actor = (actor + 1) % self._s.numP  #move to next player
 
         #return uncalled chips to raiser
-        uniqueBets = sorted(set(self._s.currBets))
-        maxBet = uniqueBets[-1]
-        if len(uniqueBets) >= 2: belowMax = uniqueBets[-2]
-        if len([b for b in self._s.currBets if b==maxBet]) == 1:
-            for i in range(self._s.numP):
-                if self._s.currBets[i] == maxBet:
-                    self._s.currBets[i] = belowMax
-                    player = self._playing[i]
-                    player.addChips(maxBet - belowMax)
-                    if self._vocal: print maxBet - belowMax, 'uncalled chips return to', player.getName() 
+        maxBet = self._s.maxBet
+        if self._s.currBets.count(maxBet) == 1 and self._s.numP > 1:
+            belowMax = max([b for b in self._s.currBets if b != maxBet])
+            i = self._s.currBets.index(maxBet)
+            self._s.currBets[i] = belowMax
+            player = self._playing[i]
+            player.addChips(maxBet - belowMax)
+            if self._listeners:
+                for l in self._listeners: l.uncalled(i, player, maxBet - belowMax)
 
         self._s.actor = None    #action has closed
         
@@ -266,6 +439,10 @@ class Table:
             self._s.bets[i] += self._s.currBets[i]    
             self._s.currBets[i] = 0
             self._s.numRaises[i] = 0
+        self._s.maxBet = 0
+
+        if self._listeners:
+            for l in self._listeners: l.endRound()
 
     def _parseAction(self, action):
 
@@ -275,16 +452,16 @@ class Table:
         """
         actor = self._s.actor
         player = self._playing[actor]
-        m = max(self._s.currBets)    #largest contribution that any player has in current pot
+        m = self._s.maxBet    #largest contribution that any player has in current pot
         currentBet = self._s.currBets[actor]
+        amount, allIn = 0, False    #chips called or raised by and whether player is all-in, for listeners
 
         if action[0] == 'check':
             if currentBet < m: raise Exception('Player must call to remain in the pot.')
-            if self._vocal: print player.getName(), 'checks.'
         
         elif action[0] == 'fold': 
-            self._s.folded.append(actor)
-            if self._vocal: print player.getName(), 'folds.'  
+            self._s.folded.add(actor)
+            self._s.nActive -= 1
         
         elif action[0] == 'call': 
             toCall = self._s.toCall
@@ -293,12 +470,13 @@ class Table:
             if stack <= toCall:    #player has all-in called
                 self._s.currBets[actor] += stack
                 player.removeChips(stack)
-                if self._vocal: print player.getName(), 'all-in calls with', stack 
-                self._s.allIn.append(actor)
+                amount, allIn = stack, True
+                self._s.allIn.add(actor)
+                self._s.nActive -= 1
             else:
                 self._s.currBets[actor] = m
                 player.removeChips(m - currentBet)
-                if self._vocal: print player.getName(), 'calls', m - currentBet
+                amount, allIn = m - currentBet, False
         
         elif action[0] == 'raise' or action[0] == 'bet':    #raising is interpreted as "raise to" a a new total bet
             raiseTo = action[1]    #new total bet of player
@@ -308,16 +486,20 @@ class Table:
             if raiseTo < self._s.minRaise: raise Exception('Raise amount is less than minimum raise.')
             self._s.minRaise = raiseTo + raiseBy    #player must raise by twice as much as last raise
             self._s.currBets[actor] = raiseTo
+            self._s.maxBet = raiseTo
             player.removeChips(raiseTo - currentBet)
             self._s.numRaises[actor] += 1
             allIn  = player.getStack() == 0
-            if allIn: self._s.allIn.append(actor)
-            if self._vocal: 
-                if not allIn: print player.getName(), 'raises', raiseBy, 'to', raiseTo
-                else: print player.getName(), 'raises all-in', raiseBy, 'to', raiseTo
+            if allIn: 
+                self._s.allIn.add(actor)
+                self._s.nActive -= 1
+            amount = raiseBy
         
         else: raise Exception('Invalid player action.')
 
+        if self._listeners:
+            for l in self._listeners: l.action(actor, player, action[0], amount, self._s.currBets[actor], allIn)
+
     def getPlaying(self): return self._playing[:]
 
     def getSitOut(self): return self._sitOut[:]
@@ -325,3 +507,5 @@ class Table:
     def getPlayers(self): return self._players[:]
 
     def getParams(self): return (self._smallBlind, self._bigBlind, self._maxBuyIn)
+
+    def getListeners(self): return self._listeners[:]
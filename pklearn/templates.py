@@ -1,7 +1,13 @@
 import time
+import json
+import cPickle
+import numpy as np
+from multiprocessing import Pool
 from player import Player
+from workers import seatSnapshot, netWinnings, bbPer100, checkTrainPolicy
 
-def simulate(table, nHands, firstTrain=0, nTrain=0, nBuyIn=0, tPrint=5, vocal=False):  
+def simulate(table, nHands, firstTrain=0, nTrain=0, nBuyIn=0, tPrint=5, vocal=False, metrics=None, tMetrics=None,
+             trainPolicy='full', quiet=False):  
 
     """
     This function simulates several hands of Holdem according to these parameters:
@@ -14,9 +20,24 @@ def simulate(table, nHands, firstTrain=0, nTrain=0, nBuyIn=0, tPrint=5, vocal=Fa
     nBuyIn - number of hands between cashing out/buying in players (int)
     tPrint - number of seconds between printing hand number (int)
     vocal - hands are narrated by table when vocal is True (bool)
+    metrics - callable which accepts a dictionary of metrics, or path of a file which metrics are appended to
+              as JSON lines (callable or string)
+    tMetrics - number of seconds between progress metrics, tPrint by default (int)
+    trainPolicy - 'full' to refit players on all of their memory at each training, 'incremental' to update them
+                  with the samples stored since their last training, see Player.train, or callable which accepts
+                  a player and the number of times players have trained so far and returns True to update the
+                  player incrementally (string or callable)
+    quiet - progress is not printed when quiet is True, e.g. in worker processes (bool)
+
+    Metrics are emitted as dictionaries with an 'event' of 'progress' every tMetrics seconds, 'train' after
+    each training and 'end' at the end of the simulation. Progress and end metrics hold the hands simulated and
+    elapsed seconds, hands and decisions per second and mean regressor prediction latency since the last
+    progress metrics (since the start for end metrics), and the number of failed hands, buy ins and failed
+    buy ins so far. Train metrics hold the training seconds, number of samples in memory and whether the regressor
+    was updated incrementally of each player.
     """
 
-    print 'Beginning simulation of', nHands, 'hands.'
+    if not quiet: print 'Beginning simulation of', nHands, 'hands.'
 
     players = table.getPlayers()
     bankroll = [[] for p in players]    #holds bankroll history of all players
@@ -27,28 +48,50 @@ def simulate(table, nHands, firstTrain=0, nTrain=0, nBuyIn=0, tPrint=5, vocal=Fa
         p.cashOut()
         if p.getStack() < maxBuyIn: p.buyChips(maxBuyIn)
 
+    telemetry = _Telemetry(metrics, players) if metrics is not None else None
+    if tMetrics is None: tMetrics = tPrint
+
+    checkTrainPolicy(trainPolicy)
+
     nextTrain = firstTrain    #next hand players will train
     if firstTrain == 0: nextTrain = nTrain
     nextBuyIn = nBuyIn        #next hand players will cash out and buy in
+    nTrainings = 0            #times players have trained
     hand = 1                  #hands started
     lastTime = time.time()    #last time printed hands completed
+    lastMetrics = lastTime    #last time progress metrics were emitted
     while hand <= nHands:
 
         if time.time() - lastTime > tPrint:
             lastTime = time.time()
-            print hand - 1, 'hands simulated.'
+            if not quiet: print hand - 1, 'hands simulated.'
+
+        if telemetry is not None and time.time() - lastMetrics > tMetrics:
+            lastMetrics = time.time()
+            telemetry.progress('progress', hand - 1)
         
         if hand == nextTrain:
-            print 'Players are training...'
-            for p in players: p.train()
+            if not quiet: print 'Players are training...'
+            times = []
+            incremental = []
+            for p in players: 
+                if callable(trainPolicy): update = trainPolicy(p, nTrainings)
+                else: update = trainPolicy == 'incremental'
+                start = time.time()
+                incremental.append(bool(p.train(update)))
+                times.append(time.time() - start)
+            if telemetry is not None: telemetry.train(hand - 1, times, incremental)
+            nTrainings += 1
             nextTrain = hand + nTrain
-            print 'Complete.'
+            if not quiet: print 'Complete.'
 
         if hand == nextBuyIn:
             if vocal: print 'Players are cashing out and buying in.'
             for p in players:
                 p.cashOut()
-                if p.getStack() < maxBuyIn: p.buyChips(maxBuyIn)
+                if p.getStack() < maxBuyIn: 
+                    bought = p.buyChips(maxBuyIn)
+                    if telemetry is not None: telemetry.buyIn(bought)
             nextBuyIn = hand + nBuyIn
 
         if vocal: print 'Hand', hand
@@ -56,8 +99,9 @@ def simulate(table, nHands, firstTrain=0, nTrain=0, nBuyIn=0, tPrint=5, vocal=Fa
         
         #Hand failure
         if not played:    
+            if telemetry is not None: telemetry.failedHands += 1
             if nextBuyIn == hand + nBuyIn:    #if players just bought in
-                print 'All or all but one players are bankrupt.'
+                if not quiet: print 'All or all but one players are bankrupt.'
                 break
 
             #buy in and redo hand
@@ -68,9 +112,130 @@ def simulate(table, nHands, firstTrain=0, nTrain=0, nBuyIn=0, tPrint=5, vocal=Fa
             hand += 1
             for i in range(len(players)): bankroll[i].append(players[i].getBankroll())
 
-    print 'Simulation complete.\n'
+    if telemetry is not None: 
+        telemetry.progress('end', hand - 1, sinceStart=True)
+        telemetry.close()
+
+    if not quiet: print 'Simulation complete.\n'
     return bankroll
 
+class _Telemetry:
+
+    """ This class keeps the counters of a simulation and emits its metrics. """
+
+    def __init__(self, metrics, players):
+
+        self._file = open(metrics, 'a') if isinstance(metrics, basestring) else None
+        self._emit = metrics if self._file is None else self._write
+        self._players = players
+        self.failedHands = 0
+        self.buyIns = 0
+        self.failedBuyIns = 0
+        self._start = self._last = (time.time(), 0, self._totals())    #time, hands and player counters
+
+    def _totals(self):
+
+        counters = [p.getCounters() for p in self._players]
+        return [sum(c[k] for c in counters) for k in ('decisions', 'predicts', 'predictTime')]
+
+    def _write(self, record):
+
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def buyIn(self, bought):
+
+        self.buyIns += 1
+        if not bought: self.failedBuyIns += 1
+
+    def progress(self, event, hands, sinceStart=False):
+
+        now, totals = time.time(), self._totals()
+        then, thenHands, thenTotals = self._start if sinceStart else self._last
+        self._last = (now, hands, totals)
+
+        seconds = max(now - then, 1e-9)
+        predicts = totals[1] - thenTotals[1]
+        self._emit({'event': event, 'hands': hands, 'time': now - self._start[0],
+                    'handsPerSec': (hands - thenHands) / seconds,
+                    'decisionsPerSec': (totals[0] - thenTotals[0]) / seconds,
+                    'meanPredictLatency': (totals[2] - thenTotals[2]) / predicts if predicts else None,
+                    'failedHands': self.failedHands, 'buyIns': self.buyIns, 'failedBuyIns': self.failedBuyIns})
+
+    def train(self, hands, times, incremental):
+
+        self._emit({'event': 'train', 'hands': hands, 'time': time.time() - self._start[0],
+                    'trainTime': dict((p.getName(), t) for p, t in zip(self._players, times)),
+                    'memory': dict((p.getName(), p.getMemorySize()) for p in self._players),
+                    'incremental': dict((p.getName(), i) for p, i in zip(self._players, incremental))})
+
+    def close(self):
+        if self._file is not None: self._file.close()
+
+def simulateParallel(tableFactory, players, nHands, workers=2, nChunks=None, nBuyIn=10, seed=None):
+
+    """
+    This function simulates hands of Holdem between frozen (not training) players in parallel, by splitting
+    nHands into chunks which are simulated by a pool of processes, each with a snapshot of the players.
+
+    Parameters:
+    tableFactory - picklable callable such that tableFactory(dealer=dealer) returns an empty Table
+    players - players to seat at each table (list)
+    nHands - total number of hands to simulate (int)
+    workers - number of processes (int)
+    nChunks - number of chunks of hands, one per 1000 hands by default (int)
+    nBuyIn - number of hands between cashing out/buying in players (int)
+    seed - results are deterministic for a given seed, whatever the number of workers (int)
+
+    Returns the merged bankroll history of each player, as returned by simulate(), and a list of dictionaries
+    holding the net chips won, the win rate in big blinds per 100 hands and its standard error for each player.
+    The bankroll of each player is updated with its net winnings.
+    """
+
+    if nChunks is None: nChunks = max(1, nHands / 1000)    #independent of workers, so results are too
+    nChunks = min(nChunks, nHands)
+
+    for p in players: p.cashOut()
+    snapshot = cPickle.dumps([p.snapshot() for p in players], cPickle.HIGHEST_PROTOCOL)
+    seeds = np.random.RandomState(seed).randint(2**31 - 1, size=nChunks)
+    tasks = [(tableFactory, snapshot, nHands * (i + 1) / nChunks - nHands * i / nChunks, nBuyIn, seeds[i])
+             for i in range(nChunks)]
+
+    pool = Pool(workers)
+    try: results = pool.map(_simulateChunk, tasks)
+    finally:
+        pool.close()
+        pool.join()
+
+    #chain the bankroll changes of each chunk onto the current bankroll
+    bankroll = [[] for p in players]
+    for i in range(len(players)):
+        current = players[i].getBankroll()
+        for history, start, net, bigBlind in results:
+            bankroll[i].extend([current + b - start[i] for b in history[i]])
+            current += net[i]
+
+    stats = []
+    for i in range(len(players)):
+        net = sum(r[2][i] for r in results)
+        hands = np.array([t[2] for t in tasks], dtype=float)
+        rates = np.array([r[2][i] for r in results]) / float(results[0][3]) / hands * 100
+        stdErr = np.sqrt(np.cov(rates, aweights=hands) / len(rates)) if len(rates) > 1 else float('nan')
+        stats.append({'name': players[i].getName(), 'net': net, 'bbPer100': bbPer100(net, results[0][3], nHands),
+                      'stdErr': float(stdErr)})
+        players[i].setBankroll(players[i].getBankroll() + net)
+
+    return bankroll, stats
+
+def _simulateChunk(args):
+
+    """ This function simulates one chunk of simulateParallel() in a worker process. """
+
+    tableFactory, snapshot, nHands, nBuyIn, seed = args
+    table, players, start = seatSnapshot(tableFactory, snapshot, seed, train=False)
+    history = simulate(table, nHands, nBuyIn=nBuyIn, tPrint=float('inf'), quiet=True)
+    return history, start, netWinnings(players, start), table.getParams()[1]
+
 class BasicPlayer(Player):
 
     def _genGameFeatures(self, gameState):
@@ -90,13 +255,9 @@ class BasicPlayer(Player):
         for i in range(len(cards)):
             gameFeatures[6 * i] = 1    #ith card exists
             gameFeatures[6 * i + 1] = cards[i].getNumber()
-            suit = cards[i].getSuit()
             
-            #create binary encoding for suit
-            gameFeatures[6 * i + 2] = suit == 'c' 
-            gameFeatures[6 * i + 3] = suit == 'd'
-            gameFeatures[6 * i + 4] = suit == 's'
-            gameFeatures[6 * i + 5] = suit == 'h'
+            #create binary encoding for suit, in order c, d, s, h
+            gameFeatures[6 * i + 2 + cards[i].getSuitIndex()] = 1
 
         #player stack size
         gameFeatures[42] = self._stack
@@ -0,0 +1,56 @@
+import random
+import cPickle
+import numpy as np
+from dealer import Dealer
+
+def seatSnapshot(tableFactory, snapshot, seed, train=True):
+
+    """
+    This function prepares a worker process to play hands: it seeds the random and numpy.random modules with seed,
+    unpickles the Players of snapshot and seats them at a table from tableFactory(dealer=Dealer(seed)). Players
+    stop training if train is False. Returns the table, the Players and the bankroll of each Player.
+    """
+
+    random.seed(seed)
+    np.random.seed(seed)
+
+    players = cPickle.loads(snapshot)
+    table = tableFactory(dealer=Dealer(seed))
+    for p in players:
+        if not train: p.stopTraining()
+        table.addPlayer(p)
+
+    return table, players, [p.getBankroll() for p in players]
+
+def buyInChunks(nHands, nBuyIn):
+
+    """
+    This function returns the number of hands played after each cash out/buy in when nHands hands are played
+    with Players cashing out/buying in every nBuyIn hands, or only before the first hand if nBuyIn is 0, as in
+    simulate().
+    """
+
+    step = nBuyIn if nBuyIn > 0 else max(nHands, 1)
+    return [min(step, nHands - hand) for hand in range(0, nHands, step)]
+
+def buyIn(players, maxBuyIn):
+    for p in players:
+        p.cashOut()
+        p.buyChips(maxBuyIn)
+
+def netWinnings(players, start):
+
+    """ This function cashes out players and returns the chips each has won since its bankroll was start. """
+
+    for p in players: p.cashOut()
+    return [p.getBankroll() - start[i] for i, p in enumerate(players)]
+
+def bbPer100(net, bigBlind, hands):
+
+    """ This function returns the win rate in big blinds per 100 hands of net chips won, nan if no hands. """
+
+    return net / float(bigBlind) / hands * 100 if hands else float('nan')
+
+def checkTrainPolicy(trainPolicy):
+    if trainPolicy not in ('full', 'incremental') and not callable(trainPolicy):
+        raise Exception('Training policy must be \'full\', \'incremental\' or callable.')